@@ -8,49 +8,87 @@
 """
 
 import os
+import copy
+import functools
 import json
+import hashlib
 import logging
+import math
 import re
-from typing import Dict, List, Optional
+import sys
+import threading
+import unicodedata
+from collections import OrderedDict, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from types import MappingProxyType
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 from pathlib import Path
-from difflib import SequenceMatcher
-import PyPDF2
-import docx
+import orjson
+from rapidfuzz import fuzz, process
 
 from src.llm.client import OpenAILikeClient
 
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+_WS_RE = re.compile(r'\s+')
+_HSPACE_RE = re.compile(r'[^\S\n]+')  # Пробельные символы, кроме перевода строки
+_BLANK_LINES_RE = re.compile(r'\n(?: ?\n)+')
+_GAP_MARKER = "\n\n[...]\n\n"  # Место пропущенной середины сокращенного текста
 
 class DocumentAnalyzer:
     """
     Анализатор закупочной документации с использованием LLM
     """
 
+    __slots__ = (
+        "llm_client",
+        "model_size",
+        "generation_params",
+        "system_prompt",
+        "_llm_kwargs",
+        "result_cache",
+        "_cache",
+        "_cache_lock",
+    )
+
     # Константы
     MAX_DOCUMENTS = 50  # Максимальное количество документов
-    SIMILARITY_THRESHOLD = 0.85  # Порог сходства для дубликатов
+    MIN_NAME_LENGTH = 3  # Более короткие названия считаются мусором
+    SIMILARITY_THRESHOLD = 85  # Порог сходства для дубликатов (шкала RapidFuzz 0-100)
+    RESULT_CACHE_SIZE = 128  # Количество результатов анализа в LRU-кэше
+    MAX_TEXT_CHARS = 200_000  # Более длинный текст КД сокращается до начала и конца
+    MIN_DOC_CHARS = 64  # Более короткий текст не отправляется в LLM
+    INTERNED_FIELDS = ("category", "format")  # Поля документов с повторяющимися значениями
+    BATCH_MAX_WORKERS = 8  # Одновременных запросов к LLM при пакетном анализе
+
+    # Завершающая инструкция пользовательского сообщения
+    USER_INSTRUCTION = "\n\nВыполни полный анализ и предоставь результат в указанном JSON формате."
 
     # Параметры генерации для малых моделей (для справки и будущего использования)
-    GENERATION_PARAMS_SMALL = {
+    # Параметры общие для всех экземпляров, поэтому доступны только для чтения
+    GENERATION_PARAMS_SMALL = MappingProxyType({
         "temperature": 0.7,
         "repetition_penalty": 1.4,
         "frequency_penalty": 0.9,
         "presence_penalty": 0.7,
         "max_tokens": 4096,
         "top_p": 0.9,
-    }
+    })
 
     # Параметры для больших моделей
-    GENERATION_PARAMS_LARGE = {
+    GENERATION_PARAMS_LARGE = MappingProxyType({
         "temperature": 0.5,
         "repetition_penalty": 1.2,
         "max_tokens": 8192,
         "top_p": 0.95,
-    }
+    })
 
-    def __init__(self, llm_client: Optional[OpenAILikeClient] = None, model_size: str = "large"):
+    def __init__(
+        self,
+        llm_client: Optional[OpenAILikeClient] = None,
+        model_size: str = "large",
+        result_cache: Optional[Any] = None,
+    ):
         """
         Инициализация анализатора
         
@@ -58,6 +96,8 @@ class DocumentAnalyzer:
             llm_client: Клиент LLM (по умолчанию OpenAILikeClient из окружения)
             model_size: Размер модели ('small' для 4B-7B, 'large' для >7B).
                         Влияет на параметры генерации.
+            result_cache: Общий кэш результатов второго уровня с методами get/set
+                          (например, utils.CacheManager), разделяемый процессами
         """
         self.llm_client = llm_client or OpenAILikeClient()
         self.model_size = model_size
@@ -67,50 +107,109 @@ class DocumentAnalyzer:
             self.GENERATION_PARAMS_SMALL if model_size == "small"
             else self.GENERATION_PARAMS_LARGE
         )
+        # Аргументы вызова LLM собираются один раз, а не на каждый запрос
+        self._llm_kwargs = self._build_llm_kwargs(self.generation_params)
         
         # Загрузка промпта
         self.system_prompt = self._load_prompt()
+
+        # LRU-кэш результатов анализа по хешу нормализованного текста
+        self.result_cache = result_cache
+        self._cache: "OrderedDict[str, Dict]" = OrderedDict()
+        self._cache_lock = threading.Lock()
         
-    def _load_prompt(self) -> str:
-        """Загрузка системного промпта"""
+    @staticmethod
+    @functools.lru_cache(maxsize=1)
+    def _load_prompt() -> str:
+        """Загрузка системного промпта (файл читается один раз на процесс)"""
         prompt_path = Path(__file__).parent.parent / "prompts" / "system_prompt_v1.md"
         
         if prompt_path.exists():
             with open(prompt_path, 'r', encoding='utf-8') as f:
                 return f.read()
         else:
-            logger.warning(f"Промпт не найден по пути {prompt_path}, используется базовый")
+            logger.warning("Промпт не найден по пути %s, используется базовый", prompt_path)
             return "Ты — специализированная система анализа закупочной документации."
     
-    def extract_text_from_pdf(self, file_path: str) -> str:
-        """Извлечение текста из PDF"""
-        text = ""
+    def extract_text_from_pdf(self, file_path: str, max_chars: Optional[int] = None) -> str:
+        """
+        Извлечение текста из PDF (PyMuPDF, порядок чтения сохраняется)
+
+        При заданном max_chars страницы читаются с начала и с конца документа,
+        пока каждая половина не наберет max_chars // 2 символов; середина
+        не разбирается и, как при сокращении текста в analyze(), заменяется
+        отметкой [...].
+        """
+        # Библиотеки разбора файлов нужны только при загрузке файлов
+        import pymupdf
+
+        # При ошибке на одной из страниц возвращается текст уже разобранных
+        pages: List[str] = []
         try:
-            with open(file_path, 'rb') as file:
-                pdf_reader = PyPDF2.PdfReader(file)
-                for page in pdf_reader.pages:
-                    text += page.extract_text() + "\n"
+            with pymupdf.open(file_path) as doc:
+                if max_chars is not None:
+                    return self._extract_pdf_head_tail(doc, max_chars)
+                for page in doc:
+                    pages.append(page.get_text("text") + "\n")
         except Exception as e:
-            logger.error(f"Ошибка извлечения текста из PDF: {e}")
-        return text
+            logger.error("Ошибка извлечения текста из PDF: %s", e)
+        return "".join(pages)
     
+    @staticmethod
+    def _extract_pdf_head_tail(doc, max_chars: int) -> str:
+        """Текст начальных и конечных страниц PDF в пределах max_chars"""
+        half = max_chars // 2
+        head: List[str] = []
+        tail: List[str] = []
+        head_len = tail_len = 0
+        first, last = 0, doc.page_count - 1
+
+        try:
+            while first <= last and head_len < half:
+                page_text = doc[first].get_text("text") + "\n"
+                head.append(page_text)
+                head_len += len(page_text)
+                first += 1
+
+            while first <= last and tail_len < half:
+                page_text = doc[last].get_text("text") + "\n"
+                tail.append(page_text)
+                tail_len += len(page_text)
+                last -= 1
+        except Exception as e:
+            # Возвращается текст уже разобранных страниц; сбойная страница
+            # остается в пропущенном диапазоне first..last
+            logger.error("Ошибка извлечения текста из PDF: %s", e)
+
+        tail.reverse()
+        if first <= last:
+            logger.info("Страницы PDF %d-%d не разбирались: превышен лимит текста", first + 1, last + 1)
+            # Модель должна видеть, что часть страниц пропущена
+            return "".join(head) + _GAP_MARKER + "".join(tail)
+
+        return "".join(head + tail)
+
     def extract_text_from_docx(self, file_path: str) -> str:
         """Извлечение текста из DOCX"""
-        text = ""
+        import docx
+
+        parts = []
         try:
             doc = docx.Document(file_path)
             for para in doc.paragraphs:
-                text += para.text + "\n"
+                parts.append(para.text)
+                parts.append("\n")
         except Exception as e:
-            logger.error(f"Ошибка извлечения текста из DOCX: {e}")
-        return text
+            logger.error("Ошибка извлечения текста из DOCX: %s", e)
+        return "".join(parts)
     
-    def load_document(self, file_path: str) -> str:
+    def load_document(self, file_path: str, max_chars: Optional[int] = None) -> str:
         """
         Загрузка и извлечение текста из документа
         
         Args:
             file_path: Путь к файлу
+            max_chars: Ограничение объема текста PDF (опционально, см. extract_text_from_pdf)
             
         Returns:
             Текст документа
@@ -121,7 +220,7 @@ class DocumentAnalyzer:
             raise FileNotFoundError(f"Файл {file_path} не найден")
         
         if file_path.suffix.lower() == '.pdf':
-            return self.extract_text_from_pdf(str(file_path))
+            return self.extract_text_from_pdf(str(file_path), max_chars=max_chars)
         elif file_path.suffix.lower() in ['.docx', '.doc']:
             return self.extract_text_from_docx(str(file_path))
         elif file_path.suffix.lower() == '.txt':
@@ -141,131 +240,367 @@ class DocumentAnalyzer:
         Returns:
             Структурированный результат анализа в формате JSON
         """
-        # Если текст пустой, возвращаем пустой результат (важно для тестов)
-        if not document_text.strip():
-            return {
-                "procurement_info": {},
-                "required_documents": [],
-                "total_count": 0
-            }
+        # Нормализация один раз: общий текст для кэша и для LLM
+        document_text = self._normalize_text(document_text)
 
-        user_message = f"""
-Закупочная документация:
-{document_text}
-"""
-        
-        if provided_docs:
-            docs_list = "\n".join(f"- {doc}" for doc in provided_docs)
-            user_message += f"\n\nУже предоставленные документы:\n{docs_list}"
-        
-        user_message += "\n\nВыполни полный анализ и предоставь результат в указанном JSON формате."
-        
-        try:
-            # Формирование messages в OpenAI-формате
-            messages = [
-                {"role": "system", "content": self.system_prompt},
-                {"role": "user", "content": user_message}
-            ]
-            
-            # Используем параметры из generation_params, но с возможностью переопределения response_format
-            params = self.generation_params.copy()
-            params["response_format"] = {"type": "json_object"}  # Всегда требуем JSON
+        # Пустой или заведомо слишком короткий текст не отправляется в LLM
+        if len(document_text) < self.MIN_DOC_CHARS:
+            return self._empty_result()
 
-            # Удаляем параметры, которые не поддерживаются методом chat_completion напрямую, если они там есть
-            # OpenAILikeClient.chat_completion принимает явные аргументы, нужно передать их
+        cache_key = self._cache_key(document_text, provided_docs)
+        cached = self._cache_get(cache_key)
+        if cached is not None:
+            return cached
 
+        try:
             result_text = self.llm_client.chat_completion(
-                messages=messages,
-                temperature=params.get("temperature", 0.7),
-                top_p=params.get("top_p", 0.9),
-                max_tokens=params.get("max_tokens", 4096),
-                presence_penalty=params.get("presence_penalty", 0.6),
-                frequency_penalty=params.get("frequency_penalty", 0.8),
-                response_format=params["response_format"]
+                messages=self._build_messages(document_text, provided_docs),
+                **self._llm_kwargs
             )
-            
-            # Извлечение JSON из ответа
-            json_start = result_text.find('{')
-            json_end = result_text.rfind('}') + 1
-            
-            if json_start >= 0 and json_end > json_start:
-                json_text = result_text[json_start:json_end]
-                result = json.loads(json_text)
-            else:
-                raise ValueError("JSON не найден в ответе модели")
-            
-            # Дедупликация
-            if "required_documents" in result:
-                result["required_documents"] = self._deduplicate_documents(
-                    result["required_documents"]
-                )
-
-                # Ограничение количества
-                if len(result["required_documents"]) > self.MAX_DOCUMENTS:
-                    logger.warning(
-                        f"Truncating documents from {len(result['required_documents'])} "
-                        f"to {self.MAX_DOCUMENTS}"
-                    )
-                    result["required_documents"] = result["required_documents"][:self.MAX_DOCUMENTS]
-
-            result["total_count"] = len(result.get("required_documents", []))
-            result["model_size"] = self.model_size
+            result = self._build_result(result_text)
 
+            self._cache_put(cache_key, result)
             return result
             
         except Exception as e:
-            logger.error(f"Ошибка анализа: {e}")
+            logger.error("Ошибка анализа: %s", e)
             # Возвращаем структуру с ошибкой или пустую структуру, чтобы не ронять приложение
             # Но для сохранения совместимости с API возвращаем то что получилось или ошибку raise
             # В данном случае лучше выбросить исключение, чтобы вызывающий код знал о проблеме
             raise
+
+    def analyze_batch(
+        self,
+        document_texts: List[str],
+        provided_docs: Optional[List[Optional[List[str]]]] = None,
+        return_exceptions: bool = False,
+    ) -> List[Any]:
+        """
+        Пакетный анализ нескольких текстов
+
+        Одинаковые запросы выполняются один раз, различные — параллельно
+        в пуле потоков: вызов LLM ждет сеть и не удерживает GIL.
+
+        Args:
+            document_texts: Тексты закупочной документации
+            provided_docs: Списки предоставленных документов для каждого текста
+            return_exceptions: Возвращать исключение на месте результата
+                               вместо выброса первого из них
+
+        Returns:
+            Результаты анализа в порядке входных текстов
+        """
+        if provided_docs is None:
+            provided_docs = [None] * len(document_texts)
+
+        # Запрос -> позиции во входном списке
+        groups: Dict[Tuple, List[int]] = {}
+        for idx, (text, docs) in enumerate(zip(document_texts, provided_docs)):
+            groups.setdefault((text, tuple(sorted(docs or ()))), []).append(idx)
+
+        results: List[Any] = [None] * len(document_texts)
+        if not groups:
+            return results
+
+        workers = min(self.BATCH_MAX_WORKERS, len(groups))
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = {
+                pool.submit(self.analyze, document_texts[positions[0]], provided_docs[positions[0]]): positions
+                for positions in groups.values()
+            }
+            for future, positions in futures.items():
+                try:
+                    result = future.result()
+                except Exception as e:
+                    if not return_exceptions:
+                        raise
+                    result = e
+                results[positions[0]] = result
+                # Каждый вызывающий получает собственную копию результата
+                for idx in positions[1:]:
+                    results[idx] = result if isinstance(result, Exception) else copy.deepcopy(result)
+
+        return results
+
+    def analyze_stream(
+        self, document_text: str, provided_docs: Optional[List[str]] = None
+    ) -> Iterator[Dict]:
+        """
+        Потоковый анализ закупочной документации
+
+        Отдает фрагменты ответа модели по мере генерации ({"type": "chunk"}),
+        затем итоговый результат в том же виде, что и analyze() ({"type": "result"}).
+        Результат из кэша отдается сразу, без фрагментов.
+
+        Args:
+            document_text: Текст закупочной документации
+            provided_docs: Список уже предоставленных документов (опционально)
+            
+        Yields:
+            События анализа
+        """
+        document_text = self._normalize_text(document_text)
+
+        if len(document_text) < self.MIN_DOC_CHARS:
+            yield {"type": "result", "data": self._empty_result()}
+            return
+
+        cache_key = self._cache_key(document_text, provided_docs)
+        cached = self._cache_get(cache_key)
+        if cached is not None:
+            yield {"type": "result", "data": cached}
+            return
+
+        try:
+            parts = []
+            for chunk in self.llm_client.chat_completion_stream(
+                messages=self._build_messages(document_text, provided_docs),
+                **self._llm_kwargs
+            ):
+                parts.append(chunk)
+                yield {"type": "chunk", "content": chunk}
+
+            result = self._build_result("".join(parts))
+            self._cache_put(cache_key, result)
+
+        except Exception as e:
+            logger.error("Ошибка анализа: %s", e)
+            raise
+
+        yield {"type": "result", "data": result}
+
+    def _empty_result(self) -> Dict:
+        """Результат анализа пустого или слишком короткого текста"""
+        return {
+            "procurement_info": {},
+            "required_documents": [],
+            "total_count": 0,
+            "model_size": self.model_size,
+        }
+
+    def _build_messages(self, document_text: str, provided_docs: Optional[List[str]]) -> List[Dict]:
+        """Формирование messages в OpenAI-формате"""
+        # Сообщение собирается за один проход: текст КД может занимать мегабайты,
+        # и каждое "+=" копировало бы его целиком
+        message_parts = ["\nЗакупочная документация:\n", document_text, "\n"]
+        
+        if provided_docs:
+            message_parts.append("\n\nУже предоставленные документы:\n")
+            message_parts.append("\n".join(f"- {doc}" for doc in provided_docs))
+        
+        message_parts.append(self.USER_INSTRUCTION)
+
+        return [
+            {"role": "system", "content": self.system_prompt},
+            {"role": "user", "content": "".join(message_parts)}
+        ]
+
+    @staticmethod
+    def _build_llm_kwargs(params: Dict) -> Dict:
+        """Параметры генерации для OpenAILikeClient (chat_completion / chat_completion_stream)"""
+        # OpenAILikeClient принимает явные аргументы, а не весь generation_params
+        return {
+            "temperature": params.get("temperature", 0.7),
+            "top_p": params.get("top_p", 0.9),
+            "max_tokens": params.get("max_tokens", 4096),
+            "presence_penalty": params.get("presence_penalty", 0.6),
+            "frequency_penalty": params.get("frequency_penalty", 0.8),
+            "response_format": {"type": "json_object"},  # Всегда требуем JSON
+        }
+
+    def _build_result(self, result_text: str) -> Dict:
+        """Разбор ответа модели и формирование итогового результата"""
+        # Извлечение JSON из ответа
+        json_start = result_text.find('{')
+        json_end = result_text.rfind('}') + 1
+        
+        if json_start >= 0 and json_end > json_start:
+            json_text = result_text[json_start:json_end]
+            try:
+                parsed = orjson.loads(json_text)
+            except orjson.JSONDecodeError:
+                # orjson строже stdlib (NaN, Infinity и т.п.), повторяем через json
+                parsed = json.loads(json_text)
+        else:
+            raise ValueError("JSON не найден в ответе модели")
+        
+        # Дедупликация с ограничением количества
+        documents = self._deduplicate_documents(
+            parsed.get("required_documents", []), max_count=self.MAX_DOCUMENTS
+        )
+
+        # Значения категорий и форматов повторяются во всех документах и во всех
+        # результатах LRU-кэша; ключи словарей orjson переиспользует сам
+        for doc in documents:
+            for field in self.INTERNED_FIELDS:
+                value = doc.get(field)
+                if type(value) is str and len(value) < 64:
+                    doc[field] = sys.intern(value)
+
+        # Итоговый словарь собирается один раз: служебные поля ответа модели
+        # (document_verification, completeness_score и т.п.) сохраняются
+        return {
+            "procurement_info": {},
+            **parsed,
+            "required_documents": documents,
+            "total_count": len(documents),
+            "model_size": self.model_size,
+        }
     
-    def _deduplicate_documents(self, documents: List[Dict]) -> List[Dict]:
+    @classmethod
+    def _normalize_text(cls, document_text: str) -> str:
+        """
+        Нормализация текста КД перед анализом
+
+        Приводит текст к NFC, схлопывает горизонтальные пробелы и пустые
+        строки (шум от парсеров PDF). Переводы строк сохраняются — по ним
+        модель видит структуру таблиц и пунктов. Слишком длинный текст
+        сокращается до начала и конца: стоимость LLM линейна по длине входа.
+        """
+        text = unicodedata.normalize("NFC", document_text)
+        text = _HSPACE_RE.sub(' ', text)
+        text = _BLANK_LINES_RE.sub('\n\n', text).strip()
+
+        if len(text) > cls.MAX_TEXT_CHARS:
+            logger.warning(
+                "Текст КД сокращен с %d до %d символов", len(text), cls.MAX_TEXT_CHARS
+            )
+            half = cls.MAX_TEXT_CHARS // 2
+            text = f"{text[:half]}{_GAP_MARKER}{text[-half:]}"
+
+        return text
+
+    @staticmethod
+    def _cache_key(document_text: str, provided_docs: Optional[List[str]] = None) -> str:
+        """
+        Ключ кэша анализа
+
+        Текст нормализуется (регистр, пробельные символы), поэтому повторная
+        загрузка того же документа с другим форматированием попадает в кэш.
+        """
+        normalized = _WS_RE.sub(' ', document_text.strip().casefold())
+        key = hashlib.blake2b(normalized.encode(), digest_size=16)
+        for doc in sorted(provided_docs or []):
+            key.update(b"\x00" + doc.encode())
+        return key.hexdigest()
+
+    def _cache_get(self, cache_key: str) -> Optional[Dict]:
+        """Копия результата анализа из LRU-кэша (или общего кэша) либо None"""
+        with self._cache_lock:
+            cached = self._cache.get(cache_key)
+            if cached is not None:
+                self._cache.move_to_end(cache_key)
+        if cached is not None:
+            logger.info("Результат анализа получен из кэша")
+            return copy.deepcopy(cached)
+
+        if self.result_cache is None:
+            return None
+        cached = self.result_cache.get(self._shared_cache_key(cache_key))
+        if cached is None:
+            return None
+        logger.info("Результат анализа получен из общего кэша")
+        self._cache_store(cache_key, cached)
+        return cached
+
+    def _cache_put(self, cache_key: str, result: Dict) -> None:
+        """Сохранение результата анализа в LRU-кэш и общий кэш"""
+        self._cache_store(cache_key, result)
+        if self.result_cache is not None:
+            self.result_cache.set(self._shared_cache_key(cache_key), result)
+
+    def _cache_store(self, cache_key: str, result: Dict) -> None:
+        """Сохранение копии результата в LRU-кэш процесса"""
+        with self._cache_lock:
+            self._cache[cache_key] = copy.deepcopy(result)
+            self._cache.move_to_end(cache_key)
+            while len(self._cache) > self.RESULT_CACHE_SIZE:
+                self._cache.popitem(last=False)
+
+    def _shared_cache_key(self, cache_key: str) -> str:
+        """Ключ общего кэша: результат зависит и от параметров модели"""
+        return f"analysis:{self.model_size}:{cache_key}"
+
+    @staticmethod
+    def _normalize_name(name: str) -> str:
+        """Нормализация названия документа для сравнения"""
+        name = name.strip()
+        # Большинство названий уже без повторных пробелов; все пробельные
+        # символы, кроме обычного пробела, непечатаемые, поэтому regex
+        # нужен только при двойном пробеле или непечатаемом символе
+        if '  ' in name or not name.isprintable():
+            name = _WS_RE.sub(' ', name)
+        return name.casefold()
+
+    def _deduplicate_documents(
+        self, documents: List[Dict], max_count: int = MAX_DOCUMENTS
+    ) -> List[Dict]:
         """
         Удаление дубликатов по названию
 
         Args:
             documents: Список документов
+            max_count: Максимальное количество уникальных документов;
+                       обработка прекращается, как только оно набрано
 
         Returns:
             Уникальные документы
         """
         seen = {}
         unique = []
+        # Оставленные названия, сгруппированные по длине
+        by_len: Dict[int, List[str]] = defaultdict(list)
+
+        # fuzz.ratio <= 200 * min(a, b) / (a + b), поэтому при пороге t
+        # похожими могут быть только строки с отношением длин >= t / (200 - t)
+        len_ratio = self.SIMILARITY_THRESHOLD / (200 - self.SIMILARITY_THRESHOLD)
 
         for doc in documents:
+            if len(unique) >= max_count:
+                logger.warning("Truncating documents: limit of %d reached", max_count)
+                break
+
             if not isinstance(doc, dict) or "name" not in doc:
                 continue
 
-            # Нормализация названия
-            name_normalized = doc["name"].lower().strip()
-            name_normalized = re.sub(r'\s+', ' ', name_normalized)  # Удаление лишних пробелов
+            name_normalized = self._normalize_name(doc["name"])
 
-            if not name_normalized:
+            if len(name_normalized) < self.MIN_NAME_LENGTH:
                 continue
 
             # Проверка точного совпадения
             if name_normalized in seen:
-                logger.debug(f"Exact duplicate found: {doc['name']}")
+                logger.debug("Exact duplicate found: %s", doc["name"])
+                continue
+
+            # Кандидаты — только названия допустимой длины
+            length = len(name_normalized)
+            candidates = [
+                name
+                for other_len in range(math.ceil(length * len_ratio), int(length / len_ratio) + 1)
+                for name in by_len.get(other_len, ())
+            ]
+
+            # Проверка на похожие названия (None, если ничего не превысило порог)
+            match = process.extractOne(
+                name_normalized,
+                candidates,
+                scorer=fuzz.ratio,
+                score_cutoff=self.SIMILARITY_THRESHOLD,
+            )
+            if match is not None:
+                existing_name, similarity, _ = match
+                logger.debug(
+                    "Similar duplicate found: '%s' ~ '%s' (similarity: %.0f)",
+                    doc["name"], seen[existing_name]["name"], similarity
+                )
                 continue
 
-            # Проверка на похожие названия
-            is_similar = False
-            for existing_name in seen.keys():
-                similarity = SequenceMatcher(None, name_normalized, existing_name).ratio()
-                if similarity > self.SIMILARITY_THRESHOLD:
-                    logger.debug(
-                        f"Similar duplicate found: '{doc['name']}' ~ '{seen[existing_name]['name']}' "
-                        f"(similarity: {similarity:.2f})"
-                    )
-                    is_similar = True
-                    break
-
-            if not is_similar:
-                seen[name_normalized] = doc
-                unique.append(doc)
-
-        logger.info(f"Deduplication: {len(documents)} -> {len(unique)} documents")
+            seen[name_normalized] = doc
+            by_len[length].append(name_normalized)
+            unique.append(doc)
+
+        logger.info("Deduplication: %d -> %d documents", len(documents), len(unique))
         return unique
 
     def verify_documents(self, required: List[Dict], provided: List[str]) -> Dict:
@@ -286,8 +621,11 @@ class DocumentAnalyzer:
             "completeness_score": 0
         }
         
-        provided_normalized = [doc.lower() for doc in provided]
-        total_mandatory = 0
+        provided_normalized = tuple(doc.lower() for doc in provided)
+        # Все предоставленные названия в одной строке: проверка «требуемое входит
+        # в предоставленное» выполняется одним поиском подстроки вместо цикла
+        provided_haystack = "\x00".join(provided_normalized)
+        total_mandatory = sum(1 for req_doc in required if req_doc.get("mandatory", True))
         matched_mandatory = 0
         
         for req_doc in required:
@@ -295,11 +633,11 @@ class DocumentAnalyzer:
             is_mandatory = req_doc.get("mandatory", True)
             doc_id = req_doc.get("id", "")
             
-            if is_mandatory:
-                total_mandatory += 1
-            
             # Проверка наличия документа
-            is_provided = any(doc_name in prov or prov in doc_name for prov in provided_normalized)
+            is_provided = bool(provided_normalized) and (
+                doc_name in provided_haystack
+                or any(prov in doc_name for prov in provided_normalized)
+            )
             
             if is_provided:
                 verification["provided"].append({
@@ -334,13 +672,14 @@ def main():
     doc_path = "example_procurement.pdf"
     
     if Path(doc_path).exists():
-        text = analyzer.load_document(doc_path)
+        text = analyzer.load_document(doc_path, max_chars=analyzer.MAX_TEXT_CHARS)
         result = analyzer.analyze(text)
         
-        print(json.dumps(result, ensure_ascii=False, indent=2))
+        print(orjson.dumps(result, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS).decode())
     else:
-        logger.warning(f"Файл {doc_path} не найден")
+        logger.warning("Файл %s не найден", doc_path)
 
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
     main()
@@ -8,17 +8,26 @@ FastAPI приложение для обработки запросов на а
 """
 
 import os
+import asyncio
+import functools
+import hashlib
 import logging
 import tempfile
+import threading
+import weakref
 import json
+from collections import OrderedDict
 from pathlib import Path
-from typing import List, Optional, Dict
+from typing import List, Optional, Dict, Tuple
 
-from fastapi import FastAPI, File, UploadFile, HTTPException, BackgroundTasks, Query
+import orjson
+from fastapi import FastAPI, File, UploadFile, HTTPException, BackgroundTasks, Query, Depends, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import HTMLResponse, FileResponse
-from pydantic import BaseModel
+from fastapi.responses import HTMLResponse, FileResponse, JSONResponse, Response, StreamingResponse
+from fastapi.exceptions import RequestValidationError
+from pydantic import BaseModel, ConfigDict, TypeAdapter, ValidationError
 
 from src.analyzer import DocumentAnalyzer
 from src.document_registry import DocumentRegistry
@@ -33,13 +42,41 @@ from src.readiness_report import ReadinessReport
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+class ORJSONResponse(JSONResponse):
+    """
+    JSON-ответ, сериализуемый через orjson
+
+    Собственный класс вместо fastapi.responses.ORJSONResponse: тот объявлен
+    устаревшим в новых версиях FastAPI, а поддерживаемый диапазон версий широкий.
+    """
+
+    def render(self, content) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+
+
+class StreamAwareGZipMiddleware(GZipMiddleware):
+    """
+    GZip для всех ответов, кроме потоковых (/stream)
+
+    Старые версии Starlette не сбрасывают буфер gzip между фрагментами,
+    и события NDJSON задерживались бы до накопления блока.
+    """
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] == "http" and scope["path"].endswith("/stream"):
+            await self.app(scope, receive, send)
+            return
+        await super().__call__(scope, receive, send)
+
+
 # Инициализация приложения
 app = FastAPI(
     title="АИС УДЗ API",
     description="API для анализа закупочной документации",
     version="2.0.0",
     docs_url="/api/docs",
-    redoc_url="/api/redoc"
+    redoc_url="/api/redoc",
+    default_response_class=ORJSONResponse
 )
 
 # CORS
@@ -51,35 +88,62 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Сжатие ответов: JSON с повторяющимися ключами (doc_id, mandatory, ...) сжимается в разы.
+# HTTP/2 обеспечивается обратным прокси перед uvicorn
+app.add_middleware(StreamAwareGZipMiddleware, minimum_size=1024)
+
 # Инициализация компонентов
-analyzer = DocumentAnalyzer()
+# Анализатор создается при первом запросе анализа (см. get_analyzer)
+_analyzer: Optional[DocumentAnalyzer] = None
+_analyzer_lock = threading.Lock()
 registry = DocumentRegistry()
 package_builder = PackageBuilder()
 controller = MultiStageController()
 report_generator = ReportGenerator()
 
 # Опциональные компоненты (требуют конфигурации)
-template_library = None
+# Каталог типовых документов задается переменной TEMPLATE_CATALOG_PATH
+# или присваиванием template_library (см. get_template_library)
+template_library: Optional[TemplateLibrary] = None
 forms_extractor = None
 manifest_builder = PackageManifest()
 readiness_reporter = ReadinessReport()
 
+# Кэш извлеченного текста загруженных файлов: (хеш содержимого, расширение) -> текст
+EXTRACTION_CACHE_SIZE = 64
+UPLOAD_CHUNK_SIZE = 1 << 20  # Загрузка копируется на диск блоками по 1 МБ
+_extraction_cache: "OrderedDict[Tuple[str, str], str]" = OrderedDict()
+_extraction_cache_lock = threading.Lock()
+
+# Пакетирование запросов /api/v1/analyze
+ANALYZE_BATCH_WINDOW = 0.02  # Окно сбора пакета, секунды
+ANALYZE_BATCH_MAX_SIZE = 16  # Максимальный размер пакета
+
 
 # ===================== Pydantic Models =====================
 
-class AnalysisRequest(BaseModel):
+class RequestModel(BaseModel):
+    """
+    Базовая модель тела запроса
+
+    Тела запросов не изменяются после разбора; лишние поля отбрасываются.
+    """
+    model_config = ConfigDict(frozen=True, extra="ignore", validate_assignment=False)
+
+
+class AnalysisRequest(RequestModel):
     """Запрос на анализ текста"""
     text: str
     provided_documents: Optional[List[str]] = None
 
 
-class VerificationRequest(BaseModel):
+class VerificationRequest(RequestModel):
     """Запрос на сверку документов"""
     required_documents: List[Dict]
     provided_documents: List[str]
 
 
-class DocumentCreate(BaseModel):
+class DocumentCreate(RequestModel):
     """Создание документа в реестре"""
     name: str
     category: str
@@ -88,7 +152,7 @@ class DocumentCreate(BaseModel):
     file_path: Optional[str] = None
 
 
-class RequisitesUpdate(BaseModel):
+class RequisitesUpdate(RequestModel):
     """Обновление реквизитов"""
     full_name: str
     short_name: Optional[str] = None
@@ -99,7 +163,7 @@ class RequisitesUpdate(BaseModel):
     bank_details: Optional[Dict] = None
 
 
-class ChecklistUpdate(BaseModel):
+class ChecklistUpdate(RequestModel):
     """Обновление чек-листа"""
     item_id: str
     checked: bool
@@ -108,7 +172,7 @@ class ChecklistUpdate(BaseModel):
     comment: Optional[str] = ""
 
 
-class PackageRequest(BaseModel):
+class PackageRequest(RequestModel):
     """Запрос на формирование пакета"""
     procurement_id: str
     required_documents: List[Dict]
@@ -117,39 +181,223 @@ class PackageRequest(BaseModel):
 
 # ===================== API Endpoints =====================
 
+def _static_json(payload: Dict) -> Tuple[bytes, str]:
+    """Тело и ETag неизменяемого JSON-ответа, вычисляемые один раз при запуске"""
+    body = orjson.dumps(payload)
+    return body, f'"{hashlib.blake2b(body, digest_size=8).hexdigest()}"'
+
+
+def _static_json_response(request: Request, body: bytes, etag: str) -> Response:
+    """Ответ с заранее сериализованным телом; 304 при совпадении If-None-Match"""
+    headers = {"ETag": etag, "Cache-Control": "max-age=5"}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+_ROOT_BODY, _ROOT_ETAG = _static_json({
+    "message": "АИС УДЗ API v2.0",
+    "status": "running",
+    "endpoints": {
+        "api_docs": "/api/docs",
+        "web_interface": "/web",
+        "health": "/health",
+    }
+})
+
+_HEALTH_BODY, _HEALTH_ETAG = _static_json({
+    "status": "healthy",
+    "service": "АИС УДЗ",
+    "version": "2.0.0",
+    "components": {
+        "analyzer": "ready",
+        "registry": "ready",
+        "controller": "ready",
+    }
+})
+
+
 @app.get("/")
-async def root():
+async def root(request: Request):
     """Корневой эндпоинт"""
-    return {
-        "message": "АИС УДЗ API v2.0",
-        "status": "running",
-        "endpoints": {
-            "api_docs": "/api/docs",
-            "web_interface": "/web",
-            "health": "/health",
-        }
-    }
+    return _static_json_response(request, _ROOT_BODY, _ROOT_ETAG)
 
 
 @app.get("/health")
-async def health_check():
-    """Проверка работоспособности"""
-    return {
-        "status": "healthy",
-        "service": "АИС УДЗ",
-        "version": "2.0.0",
-        "components": {
-            "analyzer": "ready",
-            "registry": "ready",
-            "controller": "ready",
-        }
-    }
+async def health_check(request: Request):
+    """Проверка работоспособности (частые опросы проб обслуживаются без сериализации)"""
+    return _static_json_response(request, _HEALTH_BODY, _HEALTH_ETAG)
 
 
 # ===================== Анализ документации =====================
 
+def get_analyzer() -> DocumentAnalyzer:
+    """
+    Общий анализатор, создаваемый при первом обращении
+
+    Загрузка промпта и создание LLM-клиента не задерживают запуск
+    приложения и /health.
+    """
+    global _analyzer
+    if _analyzer is None:
+        with _analyzer_lock:
+            if _analyzer is None:
+                _analyzer = DocumentAnalyzer(result_cache=_shared_result_cache())
+    return _analyzer
+
+
+def _shared_result_cache():
+    """
+    Общий для процессов uvicorn кэш результатов анализа (опционально)
+
+    Включается переменной ANALYSIS_CACHE_DIR; без нее каждый процесс
+    использует только собственный LRU-кэш анализатора.
+    """
+    cache_dir = os.getenv("ANALYSIS_CACHE_DIR")
+    if not cache_dir:
+        return None
+
+    from src.utils.cache_manager import CacheManager
+
+    ttl_hours = int(os.getenv("ANALYSIS_CACHE_TTL_HOURS", "24"))
+    try:
+        return CacheManager(cache_dir=cache_dir, ttl_hours=ttl_hours)
+    except OSError as e:
+        # Недоступный каталог не должен ломать анализ: остается LRU процесса
+        logger.error(f"Общий кэш анализа отключен ({cache_dir}): {e}")
+        return None
+
+
+def _extract_text_cached(
+    analyzer: DocumentAnalyzer, file_path: str, content_hash: str, suffix: str
+) -> str:
+    """
+    Извлечение текста из загруженного файла с кэшем по хешу содержимого
+
+    Разбор детерминирован, поэтому повторная загрузка того же файла
+    (например, при уточнении списка предоставленных документов)
+    не требует повторного разбора PDF/DOCX.
+    """
+    key = (content_hash, suffix.lower())
+    with _extraction_cache_lock:
+        text = _extraction_cache.get(key)
+        if text is not None:
+            _extraction_cache.move_to_end(key)
+            logger.info("Текст файла получен из кэша")
+            return text
+
+    # Страницы PDF сверх лимита текста analyze() не разбираются
+    text = analyzer.load_document(file_path, max_chars=analyzer.MAX_TEXT_CHARS)
+
+    # Пустой текст не кэшируется: это может быть ошибка разбора
+    if text:
+        with _extraction_cache_lock:
+            _extraction_cache[key] = text
+            while len(_extraction_cache) > EXTRACTION_CACHE_SIZE:
+                _extraction_cache.popitem(last=False)
+    return text
+
+
+class AnalysisBatcher:
+    """
+    Сбор одновременных запросов анализа в пакеты
+
+    Запросы, пришедшие в пределах окна, передаются в
+    DocumentAnalyzer.analyze_batch одним вызовом: одинаковые тексты
+    анализируются один раз, остальные — параллельно. Одиночный запрос
+    обрабатывается сразу; окно ожидается, только если к моменту его
+    получения в очереди уже есть другие запросы.
+    """
+
+    def __init__(self, window: float = ANALYZE_BATCH_WINDOW, max_size: int = ANALYZE_BATCH_MAX_SIZE):
+        self.window = window
+        self.max_size = max_size
+        # Очередь и обработчик для каждого event loop, в котором были запросы
+        self._queues: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+        # Ссылки на задачи обработки пакетов, чтобы их не собрал сборщик мусора
+        self._dispatching: set = set()
+
+    async def submit(
+        self,
+        analyzer: DocumentAnalyzer,
+        text: str,
+        provided_docs: Optional[List[str]] = None
+    ) -> Dict:
+        """Поставить запрос в очередь и дождаться результата анализа"""
+        loop = asyncio.get_running_loop()
+        queue, worker = self._queues.get(loop, (None, None))
+        if worker is None or worker.done():
+            queue = asyncio.Queue()
+            self._queues[loop] = (queue, loop.create_task(self._collect(queue)))
+
+        future = loop.create_future()
+        await queue.put((analyzer, text, provided_docs, future))
+        return await future
+
+    async def _collect(self, queue: asyncio.Queue) -> None:
+        """Сбор пакетов из очереди в пределах окна"""
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await queue.get()]
+            # Один проход цикла событий дает поставить в очередь запросы,
+            # пришедшие одновременно; без них окно не ожидается
+            await asyncio.sleep(0)
+            if queue.empty():
+                self._start_dispatch(loop, batch)
+                continue
+
+            deadline = loop.time() + self.window
+            while len(batch) < self.max_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            self._start_dispatch(loop, batch)
+
+    def _start_dispatch(self, loop: asyncio.AbstractEventLoop, batch: List[Tuple]) -> None:
+        """Пакет обрабатывается отдельно, сбор следующего не ждет его завершения"""
+        task = loop.create_task(self._dispatch(batch))
+        self._dispatching.add(task)
+        task.add_done_callback(self._dispatching.discard)
+
+    @staticmethod
+    async def _dispatch(batch: List[Tuple]) -> None:
+        """Анализ пакета и передача результатов ожидающим запросам"""
+        by_analyzer: Dict[DocumentAnalyzer, List[Tuple]] = {}
+        for item in batch:
+            by_analyzer.setdefault(item[0], []).append(item)
+
+        for analyzer, items in by_analyzer.items():
+            try:
+                results = await asyncio.to_thread(
+                    analyzer.analyze_batch,
+                    [text for _, text, _, _ in items],
+                    [docs for _, _, docs, _ in items],
+                    return_exceptions=True
+                )
+            except Exception as e:
+                results = [e] * len(items)
+
+            for (_, _, _, future), result in zip(items, results):
+                if future.done():
+                    continue
+                if isinstance(result, Exception):
+                    future.set_exception(result)
+                else:
+                    future.set_result(result)
+
+
+analysis_batcher = AnalysisBatcher()
+
+
 @app.post("/api/v1/analyze")
-async def analyze_text(request: AnalysisRequest):
+async def analyze_text(
+    request: AnalysisRequest,
+    analyzer: DocumentAnalyzer = Depends(get_analyzer)
+):
     """
     Анализ текста закупочной документации
 
@@ -158,9 +406,10 @@ async def analyze_text(request: AnalysisRequest):
     try:
         logger.info(f"Получен запрос на анализ текста (длина: {len(request.text)} символов)")
 
-        result = analyzer.analyze(
-            document_text=request.text,
-            provided_docs=request.provided_documents
+        # Одновременные запросы объединяются в пакет; вызов LLM выполняется
+        # в потоках, чтобы не блокировать event loop
+        result = await analysis_batcher.submit(
+            analyzer, request.text, request.provided_documents
         )
 
         return result
@@ -170,8 +419,40 @@ async def analyze_text(request: AnalysisRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.post("/api/v1/analyze/stream")
+async def analyze_text_stream(
+    request: AnalysisRequest,
+    analyzer: DocumentAnalyzer = Depends(get_analyzer)
+):
+    """
+    Потоковый анализ текста закупочной документации (NDJSON)
+
+    Каждая строка ответа — событие: {"type": "chunk", "content": ...} с фрагментом
+    ответа модели, затем {"type": "result", "data": ...} с итоговым результатом
+    или {"type": "error", "detail": ...}.
+    """
+    logger.info(f"Получен запрос на потоковый анализ текста (длина: {len(request.text)} символов)")
+
+    def events():
+        # Синхронный генератор: StreamingResponse обходит его в пуле потоков
+        try:
+            for event in analyzer.analyze_stream(
+                document_text=request.text,
+                provided_docs=request.provided_documents
+            ):
+                yield orjson.dumps(event, option=orjson.OPT_APPEND_NEWLINE)
+        except Exception as e:
+            logger.error(f"Ошибка потокового анализа: {e}")
+            yield orjson.dumps({"type": "error", "detail": str(e)}, option=orjson.OPT_APPEND_NEWLINE)
+
+    return StreamingResponse(events(), media_type="application/x-ndjson")
+
+
 @app.post("/api/v1/analyze/file")
-async def analyze_file(file: UploadFile = File(...)):
+async def analyze_file(
+    file: UploadFile = File(...),
+    analyzer: DocumentAnalyzer = Depends(get_analyzer)
+):
     """
     Анализ файла закупочной документации
 
@@ -180,40 +461,47 @@ async def analyze_file(file: UploadFile = File(...)):
     try:
         logger.info(f"Получен файл: {file.filename}")
 
-        # Сохранение во временный файл
+        # Сохранение во временный файл блоками: загрузка не копируется в память целиком
         suffix = Path(file.filename).suffix if file.filename else ".txt"
+        content_hash = hashlib.blake2b(digest_size=16)
         with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as tmp:
-            content = await file.read()
-            tmp.write(content)
+            while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+                content_hash.update(chunk)
+                tmp.write(chunk)
             tmp_path = tmp.name
 
         try:
-            # Извлечение текста
-            text = analyzer.load_document(tmp_path)
-
-            # Анализ
-            result = analyzer.analyze(text)
-
-            return result
-
+            # Извлечение текста в отдельном потоке: разбор PDF не блокирует event loop
+            text = await asyncio.to_thread(
+                _extract_text_cached, analyzer, tmp_path, content_hash.hexdigest(), suffix
+            )
         finally:
             # Удаление временного файла
             Path(tmp_path).unlink(missing_ok=True)
 
+        # Анализ (результат кэшируется в DocumentAnalyzer по тексту)
+        result = await asyncio.to_thread(analyzer.analyze, text)
+
+        return result
+
     except Exception as e:
         logger.error(f"Ошибка анализа файла: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @app.post("/api/v1/verify")
-async def verify_documents(request: VerificationRequest):
+async def verify_documents(
+    request: VerificationRequest,
+    analyzer: DocumentAnalyzer = Depends(get_analyzer)
+):
     """
     Сверка предоставленных документов с требованиями
     """
     try:
         logger.info(f"Сверка {len(request.provided_documents)} документов")
 
-        result = analyzer.verify_documents(
+        result = await asyncio.to_thread(
+            analyzer.verify_documents,
             required=request.required_documents,
             provided=request.provided_documents
         )
@@ -229,23 +517,33 @@ async def verify_documents(request: VerificationRequest):
 
 @app.get("/api/v1/documents")
 async def list_documents(
+    request: Request,
     category: Optional[str] = None,
     status: Optional[str] = None,
     query: Optional[str] = None
 ):
-    """Получить список документов из реестра"""
+    """
+    Получить список документов из реестра
+
+    Ответ снабжается ETag: при повторном опросе с If-None-Match
+    и неизменном списке возвращается 304 без тела.
+    """
     documents = registry.search_documents(
         query=query,
         category=category,
         status=status
     )
-    return {"documents": documents, "total": len(documents)}
+    body = orjson.dumps({"documents": documents, "total": len(documents)})
+    etag = f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers={"ETag": etag})
+    return Response(content=body, media_type="application/json", headers={"ETag": etag})
 
 
 @app.post("/api/v1/documents")
 async def create_document(document: DocumentCreate):
     """Добавить документ в реестр"""
-    doc_id = registry.add_document(document.dict())
+    doc_id = registry.add_document(document.model_dump())
     return {"id": doc_id, "status": "created"}
 
 
@@ -259,7 +557,7 @@ async def get_expiring_documents(days: int = 30):
 @app.put("/api/v1/requisites")
 async def update_requisites(requisites: RequisitesUpdate):
     """Обновить реквизиты организации"""
-    registry.set_requisites(requisites.dict())
+    registry.set_requisites(requisites.model_dump())
     return {"status": "updated"}
 
 
@@ -272,27 +570,36 @@ async def get_requisites():
 # ===================== Многоэтапный контроль =====================
 
 @app.post("/api/v1/control/execute")
-async def execute_control(package: Dict):
-    """Выполнить многоэтапный контроль пакета"""
-    result = controller.execute_full_control(package)
+def execute_control(package: Dict, summary_only: bool = False):
+    """
+    Выполнить многоэтапный контроль пакета
+
+    Обработчик синхронный: FastAPI выполняет его в пуле потоков,
+    и проверка пакета не блокирует event loop. С summary_only=true
+    по этапам возвращаются только статусы.
+    """
+    result = controller.execute_full_control(package, summary_only=summary_only)
     return result
 
 
+# Обработчики чек-листов и истории тоже синхронные: состояние этапов
+# защищено блокировкой контроллера, которую нельзя ждать в event loop
+
 @app.get("/api/v1/control/checklists")
-async def get_all_checklists():
+def get_all_checklists():
     """Получить все чек-листы контроля"""
     return controller.get_all_checklists()
 
 
 @app.get("/api/v1/control/checklists/{stage_index}")
-async def get_stage_checklist(stage_index: int):
+def get_stage_checklist(stage_index: int):
     """Получить чек-лист конкретного этапа"""
     checklist = controller.get_stage_checklist(stage_index)
     return {"stage_index": stage_index, "checklist": checklist}
 
 
 @app.put("/api/v1/control/checklists/{stage_index}")
-async def update_checklist(stage_index: int, update: ChecklistUpdate):
+def update_checklist(stage_index: int, update: ChecklistUpdate):
     """Обновить пункт чек-листа"""
     success = controller.update_checklist_item(
         stage_index=stage_index,
@@ -308,19 +615,74 @@ async def update_checklist(stage_index: int, update: ChecklistUpdate):
 
 
 @app.get("/api/v1/control/history")
-async def get_control_history():
+def get_control_history():
     """Получить историю контроля"""
     return controller.get_control_history()
 
 
 # ===================== Формирование пакетов =====================
 
-@app.post("/api/v1/packages/match")
-async def match_documents(
-    required: List[Dict],
-    available: Optional[List[Dict]] = None
-):
-    """Сопоставить требуемые документы с имеющимися"""
+# Валидатор списков документов создается один раз, а не на каждый запрос
+_DICT_LIST = TypeAdapter(List[Dict])
+
+_MATCH_REQUEST_SCHEMA = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            "application/json": {
+                "schema": {
+                    "type": "object",
+                    "required": ["required"],
+                    "properties": {
+                        "required": {"type": "array", "items": {"type": "object"}},
+                        "available": {"type": "array", "items": {"type": "object"}},
+                    },
+                }
+            }
+        },
+    }
+}
+
+
+def _body_dict_list(payload: Dict, field: str, required: bool = False) -> Optional[List[Dict]]:
+    """Поле тела запроса со списком документов; ошибки дают стандартный ответ 422"""
+    value = payload.get(field)
+    if value is None:
+        if required:
+            raise RequestValidationError([
+                {"type": "missing", "loc": ("body", field), "msg": "Field required", "input": None}
+            ])
+        return None
+    try:
+        return _DICT_LIST.validate_python(value)
+    except ValidationError as e:
+        raise RequestValidationError([
+            {**error, "loc": ("body", field, *error["loc"])}
+            for error in e.errors(include_url=False)
+        ])
+
+
+@app.post("/api/v1/packages/match", openapi_extra=_MATCH_REQUEST_SCHEMA)
+async def match_documents(request: Request):
+    """
+    Сопоставить требуемые документы с имеющимися
+
+    Тело: {"required": [...], "available": [...]}; без available
+    используются документы из реестра.
+    """
+    try:
+        payload = orjson.loads(await request.body())
+    except orjson.JSONDecodeError as e:
+        raise RequestValidationError([
+            {"type": "json_invalid", "loc": ("body",), "msg": str(e), "input": None}
+        ])
+    if not isinstance(payload, dict):
+        raise RequestValidationError([
+            {"type": "dict_type", "loc": ("body",), "msg": "Input should be a valid dictionary", "input": None}
+        ])
+
+    required = _body_dict_list(payload, "required", required=True)
+    available = _body_dict_list(payload, "available")
     if available is None:
         available = registry.search_documents()
 
@@ -378,36 +740,48 @@ async def get_analytics():
 
 # ===================== Типовые документы =====================
 
+@functools.lru_cache(maxsize=1)
+def _template_library_from_env() -> Optional[TemplateLibrary]:
+    """Каталог типовых документов из TEMPLATE_CATALOG_PATH (создается один раз)"""
+    catalog_path = os.getenv("TEMPLATE_CATALOG_PATH")
+    return TemplateLibrary(catalog_path) if catalog_path else None
+
+
+def get_template_library() -> TemplateLibrary:
+    """
+    Каталог типовых документов для эндпоинтов /api/v1/templates
+
+    Если каталог не настроен, запрос завершается ответом 503
+    до вызова обработчика.
+    """
+    library = template_library or _template_library_from_env()
+    if library is None:
+        raise HTTPException(status_code=503, detail="Каталог типовых документов не настроен")
+    return library
+
+
 @app.get("/api/v1/templates")
-async def list_templates():
+async def list_templates(library: TemplateLibrary = Depends(get_template_library)):
     """Получить список типовых документов"""
-    if template_library is None:
-        return {"templates": [], "message": "Каталог типовых документов не настроен"}
-
-    templates = template_library.get_all_templates()
+    templates = library.get_all_templates()
     return {"templates": templates, "total": len(templates)}
 
 
 @app.get("/api/v1/templates/search")
 async def search_templates(
     query: str,
-    document_type: Optional[str] = None
+    document_type: Optional[str] = None,
+    library: TemplateLibrary = Depends(get_template_library)
 ):
     """Поиск типового документа"""
-    if template_library is None:
-        return {"results": [], "message": "Каталог типовых документов не настроен"}
-
-    results = template_library.search_template(query, document_type)
+    results = library.search_template(query, document_type)
     return {"results": results}
 
 
 @app.get("/api/v1/templates/stats")
-async def get_templates_stats():
+async def get_templates_stats(library: TemplateLibrary = Depends(get_template_library)):
     """Статистика каталога типовых документов"""
-    if template_library is None:
-        return {"message": "Каталог типовых документов не настроен"}
-
-    return template_library.get_statistics()
+    return library.get_statistics()
 
 
 # ===================== Статический контент =====================
@@ -417,15 +791,7 @@ WEB_DIR = Path(__file__).parent.parent / "web"
 WEB_DIR.mkdir(exist_ok=True)
 
 
-@app.get("/web", response_class=HTMLResponse)
-@app.get("/web/", response_class=HTMLResponse)
-async def web_interface():
-    """Главная страница веб-интерфейса"""
-    index_path = WEB_DIR / "index.html"
-    if index_path.exists():
-        return index_path.read_text(encoding='utf-8')
-    else:
-        return """
+_WEB_FALLBACK_HTML = """
         <html>
         <head><title>АИС УДЗ</title></head>
         <body>
@@ -434,7 +800,28 @@ async def web_interface():
             <p><a href="/api/docs">API Documentation</a></p>
         </body>
         </html>
-        """
+        """.encode("utf-8")
+
+
+def _load_index_html() -> bytes:
+    """Чтение index.html веб-интерфейса (или страницы-заглушки)"""
+    index_path = WEB_DIR / "index.html"
+    if index_path.exists():
+        return index_path.read_bytes()
+    return _WEB_FALLBACK_HTML
+
+
+# Страница читается один раз при запуске; при разработке (RELOAD=1)
+# перечитывается на каждый запрос, чтобы правки были видны сразу
+_INDEX_HTML = _load_index_html()
+
+
+@app.get("/web", response_class=HTMLResponse)
+@app.get("/web/", response_class=HTMLResponse)
+async def web_interface():
+    """Главная страница веб-интерфейса"""
+    content = _load_index_html() if os.getenv("RELOAD") else _INDEX_HTML
+    return HTMLResponse(content=content)
 
 
 # Монтируем статические файлы если они есть
@@ -449,4 +836,11 @@ if __name__ == "__main__":
     host = os.getenv("API_HOST", "127.0.0.1")
     port = int(os.getenv("API_PORT", "8000"))
 
-    uvicorn.run(app, host=host, port=port)
+    # Потоки снимают блокировку event loop, но чистый Python ограничен GIL;
+    # для параллельной обработки запускается несколько процессов uvicorn
+    workers = int(os.getenv("API_WORKERS", "1"))
+
+    if workers > 1:
+        uvicorn.run("src.api:app", host=host, port=port, workers=workers)
+    else:
+        uvicorn.run(app, host=host, port=port)
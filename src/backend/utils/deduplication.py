@@ -8,17 +8,36 @@
 
 import json
 import re
-from typing import Dict, List, Set, Any, Optional
+from typing import Dict, List, Mapping, Set, Any, Optional
+from types import MappingProxyType
 from collections import defaultdict
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Скомпилированные шаблоны нормализации названий документов
+_WS_RE = re.compile(r'\s+')
+_PUNCT_RE = re.compile(r'[^\w\s\-/]')
+_NAME_REPLACEMENTS = (
+    (re.compile(r'\bсправка\s+о\s+'), 'справка_'),
+    (re.compile(r'\bвыписка\s+из\s+'), 'выписка_'),
+    (re.compile(r'\bсведения\s+о\s+'), 'сведения_'),
+    (re.compile(r'\bдоговор\s+\u043d\u0440\s+'), 'договор_'),
+)
+
+# Инкрементальный разбор оборванного JSON
+_JSON_DECODER = json.JSONDecoder()
+_JSON_WS_RE = re.compile(r'[ \t\n\r]*')
+
 
 class DocumentDeduplicator:
     """Класс для удаления дубликатов из результатов анализа."""
 
+    __slots__ = ("similarity_threshold",)
+
     MAX_DOCUMENTS = 50  # Максимальное количество документов
+    # Идентификаторы doc_1..doc_50 для перенумерации результата
+    _DOC_IDS = tuple(f"doc_{i}" for i in range(1, MAX_DOCUMENTS + 1))
 
     def __init__(self, similarity_threshold: float = 0.85):
         """
@@ -26,12 +45,6 @@ class DocumentDeduplicator:
             similarity_threshold: Порог схожести для определения дубликатов (0-1)
         """
         self.similarity_threshold = similarity_threshold
-        self.stats = {
-            "total_input": 0,
-            "duplicates_removed": 0,
-            "total_output": 0,
-            "truncated_by_limit": False
-        }
 
     @staticmethod
     def normalize_name(name: str) -> str:
@@ -51,21 +64,14 @@ class DocumentDeduplicator:
         normalized = name.lower().strip()
         
         # Удаление лишних пробелов
-        normalized = re.sub(r'\s+', ' ', normalized)
+        normalized = _WS_RE.sub(' ', normalized)
         
         # Удаление пунктуации (кроме слэша и дефиса)
-        normalized = re.sub(r'[^\w\s\-/]', '', normalized)
+        normalized = _PUNCT_RE.sub('', normalized)
         
         # Замена схожих конструкций
-        replacements = [
-            (r'\bсправка\s+о\s+', 'справка_'),
-            (r'\bвыписка\s+из\s+', 'выписка_'),
-            (r'\bсведения\s+о\s+', 'сведения_'),
-            (r'\bдоговор\s+\u043d\u0440\s+', 'договор_'),
-        ]
-        
-        for pattern, replacement in replacements:
-            normalized = re.sub(pattern, replacement, normalized)
+        for pattern, replacement in _NAME_REPLACEMENTS:
+            normalized = pattern.sub(replacement, normalized)
         
         return normalized
 
@@ -84,15 +90,21 @@ class DocumentDeduplicator:
             return 0.0
         
         # Разбиваем на множества слов
-        set1 = set(str1.split())
-        set2 = set(str2.split())
-        
-        # Коэффициент Жаккара
-        intersection = len(set1.intersection(set2))
-        union = len(set1.union(set2))
-        
+        return DocumentDeduplicator._jaccard(set(str1.split()), set(str2.split()))
+
+    @staticmethod
+    def _jaccard(set1: Set[str], set2: Set[str]) -> float:
+        """Коэффициент Жаккара для заранее построенных множеств слов."""
+        intersection = len(set1 & set2)
+        union = len(set1) + len(set2) - intersection
         return intersection / union if union > 0 else 0.0
 
+    @staticmethod
+    def _mask_jaccard(mask1: int, mask2: int) -> float:
+        """Коэффициент Жаккара для битовых масок слов."""
+        union = (mask1 | mask2).bit_count()
+        return (mask1 & mask2).bit_count() / union if union > 0 else 0.0
+
     def is_duplicate(self, doc1: Dict, doc2: Dict) -> bool:
         """
         Проверка, являются ли документы дубликатами.
@@ -122,28 +134,40 @@ class DocumentDeduplicator:
             analysis: Результат анализа с массивом required_documents
             
         Returns:
-            Обработанный результат без дубликатов
+            Обработанный результат без дубликатов; статистика
+            вызова записывается в поле deduplication_stats
         """
         documents = analysis.get("required_documents", [])
-        self.stats["total_input"] = len(documents)
         
         if not documents:
             return analysis
         
+        duplicates_removed = 0
+        truncated_by_limit = False
         unique_docs = []
         seen_names: Set[str] = set()
-        
+        # Инвертированный индекс: слово -> номера уникальных документов.
+        # При пороге > 0 коэффициент Жаккара ненулевой только у множеств
+        # с общим словом, поэтому кандидаты на дубликат берутся из индекса,
+        # а не перебором всех уже принятых документов.
+        word_index: Dict[str, List[int]] = defaultdict(list)
+        # Словарь слов -> номер бита; название представлено битовой маской,
+        # и коэффициент Жаккара считается через popcount двух целых чисел
+        vocab: Dict[str, int] = {}
+        unique_masks: List[int] = []
+        threshold = self.similarity_threshold
+
         for doc in documents:
             # Проверка лимита
             if len(unique_docs) >= self.MAX_DOCUMENTS:
-                self.stats["truncated_by_limit"] = True
+                truncated_by_limit = True
                 logger.warning(
                     f"Достигнут лимит в {self.MAX_DOCUMENTS} документов. "
                     f"Оставшиеся {len(documents) - len(unique_docs)} документов отброшены."
                 )
                 break
             
-            # Нормализация названия
+            # Нормализация названия (один раз на документ)
             name_normalized = self.normalize_name(doc.get("name", ""))
             
             if not name_normalized:
@@ -151,36 +175,51 @@ class DocumentDeduplicator:
             
             # Проверка точного дубликата
             if name_normalized in seen_names:
-                self.stats["duplicates_removed"] += 1
+                duplicates_removed += 1
                 logger.debug(f"Удален точный дубликат: {doc.get('name')}")
                 continue
             
-            # Проверка схожих документов
-            is_similar = False
-            for unique_doc in unique_docs:
-                if self.is_duplicate(doc, unique_doc):
-                    is_similar = True
-                    self.stats["duplicates_removed"] += 1
-                    logger.debug(f"Удален схожий документ: {doc.get('name')}")
-                    break
+            # Проверка схожих документов среди кандидатов с общими словами
+            words = set(name_normalized.split())
+            mask = 0
+            for word in words:
+                mask |= 1 << vocab.setdefault(word, len(vocab))
+            if threshold > 0:
+                candidates = {idx for word in words for idx in word_index.get(word, ())}
+            else:
+                candidates = range(len(unique_docs))
+            
+            is_similar = any(
+                self._mask_jaccard(mask, unique_masks[idx]) >= threshold
+                for idx in candidates
+            )
+            if is_similar:
+                duplicates_removed += 1
+                logger.debug(f"Удален схожий документ: {doc.get('name')}")
+                continue
             
-            if not is_similar:
-                seen_names.add(name_normalized)
-                unique_docs.append(doc)
+            for word in words:
+                word_index[word].append(len(unique_docs))
+            unique_masks.append(mask)
+            seen_names.add(name_normalized)
+            unique_docs.append(doc)
         
         # Перенумерация ID
-        for idx, doc in enumerate(unique_docs, 1):
-            doc["id"] = f"doc_{idx}"
-        
-        self.stats["total_output"] = len(unique_docs)
+        for doc, doc_id in zip(unique_docs, self._DOC_IDS):
+            doc["id"] = doc_id
         
         analysis["required_documents"] = unique_docs
-        analysis["deduplication_stats"] = self.stats.copy()
+        analysis["deduplication_stats"] = {
+            "total_input": len(documents),
+            "duplicates_removed": duplicates_removed,
+            "total_output": len(unique_docs),
+            "truncated_by_limit": truncated_by_limit
+        }
         
         logger.info(
             f"Дедупликация завершена: "
-            f"{self.stats['total_input']} → {self.stats['total_output']} документов, "
-            f"удалено {self.stats['duplicates_removed']} дубликатов"
+            f"{len(documents)} → {len(unique_docs)} документов, "
+            f"удалено {duplicates_removed} дубликатов"
         )
         
         return analysis
@@ -203,62 +242,106 @@ def fix_incomplete_json(json_str: str) -> str:
     except json.JSONDecodeError:
         pass
     
-    # Находим последний валидный объект в массиве
-    last_complete_obj = json_str.rfind('"},')
-    if last_complete_obj != -1:
-        # Обрезаем до последнего завершенного объекта и закрываем структуру
-        truncated = json_str[:last_complete_obj + 2]
-        
-        # Закрываем required_documents
-        if '"required_documents"' in truncated:
-            truncated += ']'
-        
-        # Добавляем остальные поля
-        truncated += ',"document_verification":{"provided":[],"missing_critical":[],"missing_optional":[],"issues":[]},'
-        truncated += '"completeness_score":0,"critical_warnings":[]}'
-        
-        try:
-            json.loads(truncated)
-            logger.info("Неполный JSON успешно исправлен")
-            return truncated
-        except json.JSONDecodeError:
-            pass
+    # Разбираем объект последовательно и останавливаемся на первом
+    # незавершенном значении; из required_documents берутся все
+    # полностью сгенерированные элементы
+    result = _parse_partial_object(json_str)
+    if result is not None and isinstance(result.get("required_documents"), list):
+        # Добавляем недостающие поля
+        result.setdefault("document_verification", {
+            "provided": [],
+            "missing_critical": [],
+            "missing_optional": [],
+            "issues": []
+        })
+        result.setdefault("completeness_score", 0)
+        result.setdefault("critical_warnings", [])
+        logger.info("Неполный JSON успешно исправлен")
+        return json.dumps(result, ensure_ascii=False)
     
     logger.error("Не удалось исправить неполный JSON")
     return ""
 
 
-def get_anti_loop_generation_params() -> Dict[str, Any]:
-    """
-    Получение параметров генерации для защиты от зацикливания.
-    
-    Returns:
-        Словарь параметров для LLM
-    """
-    return {
-        "temperature": 0.7,
-        "repetition_penalty": 1.3,  # Штраф за повторение токенов
-        "frequency_penalty": 0.8,    # Штраф пропорционально частоте
-        "presence_penalty": 0.6,     # Штраф за уже встречавшиеся токены
-        "max_tokens": 4096,
-        "top_p": 0.9,
-        # Стоп-последовательности для остановки при 51-м документе
-        "stop_sequences": [
-            "=== \u041a\u041e\u041d\u0415\u0426 \u0421\u041f\u0418\u0421\u041a\u0410 ===",
-            "51 |",
-            '"id": "doc_51"',
-        ]
-    }
+def _skip_ws(text: str, pos: int) -> int:
+    """Пропуск пробельных символов JSON начиная с позиции pos."""
+    return _JSON_WS_RE.match(text, pos).end()
 
 
-def get_anti_loop_prompt_addition() -> str:
+def _parse_partial_array(text: str, pos: int) -> List[Any]:
+    """Извлечение завершенных элементов из оборванного JSON-массива."""
+    items: List[Any] = []
+    if not text.startswith('[', pos):
+        return items
+    pos += 1
+    while True:
+        pos = _skip_ws(text, pos)
+        try:
+            item, pos = _JSON_DECODER.raw_decode(text, pos)
+        except json.JSONDecodeError:
+            return items
+        items.append(item)
+        pos = _skip_ws(text, pos)
+        if not text.startswith(',', pos):
+            return items
+        pos += 1
+
+
+def _parse_partial_object(text: str) -> Optional[Dict[str, Any]]:
     """
-    Получение дополнительной части промпта для защиты от зацикливания.
+    Разбор оборванного JSON-объекта верхнего уровня.
     
     Returns:
-        Строка с дополнительными инструкциями
+        Словарь из полностью разобранных полей или None, если текст
+        не начинается с объекта
     """
-    return """
+    pos = _skip_ws(text, 0)
+    if not text.startswith('{', pos):
+        return None
+    pos += 1
+    result: Dict[str, Any] = {}
+    while True:
+        pos = _skip_ws(text, pos)
+        try:
+            key, pos = _JSON_DECODER.raw_decode(text, pos)
+        except json.JSONDecodeError:
+            return result
+        pos = _skip_ws(text, pos)
+        if not isinstance(key, str) or not text.startswith(':', pos):
+            return result
+        pos = _skip_ws(text, pos + 1)
+        try:
+            value, pos = _JSON_DECODER.raw_decode(text, pos)
+        except json.JSONDecodeError:
+            if key == "required_documents":
+                result[key] = _parse_partial_array(text, pos)
+            return result
+        result[key] = value
+        pos = _skip_ws(text, pos)
+        if not text.startswith(',', pos):
+            return result
+        pos += 1
+
+
+# Параметры генерации для защиты от зацикливания; общие для всех вызовов,
+# поэтому доступны только для чтения
+_ANTI_LOOP_PARAMS = MappingProxyType({
+    "temperature": 0.7,
+    "repetition_penalty": 1.3,  # Штраф за повторение токенов
+    "frequency_penalty": 0.8,    # Штраф пропорционально частоте
+    "presence_penalty": 0.6,     # Штраф за уже встречавшиеся токены
+    "max_tokens": 4096,
+    "top_p": 0.9,
+    # Стоп-последовательности для остановки при 51-м документе
+    "stop_sequences": (
+        "=== \u041a\u041e\u041d\u0415\u0426 \u0421\u041f\u0418\u0421\u041a\u0410 ===",
+        "51 |",
+        '"id": "doc_51"',
+    )
+})
+
+# Дополнительная часть промпта для защиты от зацикливания
+_ANTI_LOOP_PROMPT = """
 
 # КРИТИЧЕСКОЕ ПРАВИЛО: ПРЕДОТВРАЩЕНИЕ ДУБЛИКАТОВ
 - ЗАПРЕЩЕНО добавлять документы с одинаковыми наименованиями
@@ -284,6 +367,26 @@ def get_anti_loop_prompt_addition() -> str:
 """
 
 
+def get_anti_loop_generation_params() -> Mapping[str, Any]:
+    """
+    Получение параметров генерации для защиты от зацикливания.
+    
+    Returns:
+        Словарь параметров для LLM (только для чтения)
+    """
+    return _ANTI_LOOP_PARAMS
+
+
+def get_anti_loop_prompt_addition() -> str:
+    """
+    Получение дополнительной части промпта для защиты от зацикливания.
+    
+    Returns:
+        Строка с дополнительными инструкциями
+    """
+    return _ANTI_LOOP_PROMPT
+
+
 if __name__ == "__main__":
     # Пример использования
     logging.basicConfig(level=logging.INFO)
@@ -12,18 +12,98 @@
 - FR-4.8: История контроля
 """
 
+import asyncio
+import copy
+import itertools
 import logging
-import json
-from typing import List, Dict, Optional, Any
+import os
+import threading
+import time
+from collections import Counter
+from operator import attrgetter
+from typing import Any, ClassVar, Dict, List, Optional, Sequence, Tuple
 from datetime import datetime
 from pathlib import Path
-from dataclasses import dataclass, field, asdict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+
+import orjson
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-
-@dataclass
+# Статусы этапов и итога контроля
+STATUS_PENDING = "pending"
+STATUS_PASSED = "passed"
+STATUS_WARNING = "warning"
+STATUS_FAILED = "failed"
+
+# Критичность пунктов чек-листа
+ITEM_NORMAL = "normal"
+ITEM_CRITICAL = "critical"
+
+# Уровни замечаний этапов контроля (битовые флаги)
+SEVERITY_BLOCKER = 1
+SEVERITY_CRITICAL = 2
+SEVERITY_WARNING = 4
+SEVERITY_INFO = 8
+SEVERITY_NAMES = {
+    SEVERITY_BLOCKER: "blocker",
+    SEVERITY_CRITICAL: "critical",
+    SEVERITY_WARNING: "warning",
+    SEVERITY_INFO: "info",
+}
+
+# Статусы этапов, влияющие на итог контроля (битовые флаги по убыванию приоритета)
+_STAGE_FAILED = 1
+_STAGE_WARNING = 2
+_STAGE_PENDING = 4
+_STAGE_STATUS_FLAGS = {
+    STATUS_FAILED: _STAGE_FAILED,
+    STATUS_WARNING: _STAGE_WARNING,
+    STATUS_PENDING: _STAGE_PENDING,
+}
+
+# Идентификаторы записей истории: монотонный счетчик, начатый с текущего
+# времени в микросекундах, уникален в процессе и растет между запусками.
+# В идентификатор пишется в шестнадцатеричном виде фиксированной ширины:
+# короче десятичного, а лексикографический порядок совпадает с числовым
+_entry_ids = itertools.count(time.time_ns() // 1000)
+
+# Пакеты с большим числом файлов проверяются в пуле потоков:
+# stat() на сетевом или холодном диске ждет ввода-вывода и отпускает GIL
+IO_PARALLEL_MIN_FILES = 16
+_io_executor: Optional[ThreadPoolExecutor] = None
+_io_executor_lock = threading.Lock()
+
+
+def _get_io_executor() -> ThreadPoolExecutor:
+    """Общий пул потоков для проверки файлов (создается при первом использовании)"""
+    global _io_executor
+    with _io_executor_lock:
+        if _io_executor is None:
+            _io_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="control-io")
+        return _io_executor
+
+
+def _file_size(file_path: Optional[str]) -> Optional[int]:
+    """Размер файла или None, если путь не задан или файл недоступен"""
+    if not file_path:
+        return None
+    try:
+        return os.stat(file_path).st_size
+    except OSError:
+        return None
+
+
+def _file_sizes(file_paths: List[Optional[str]]) -> List[Optional[int]]:
+    """Размеры файлов в порядке путей"""
+    if len(file_paths) < IO_PARALLEL_MIN_FILES:
+        return [_file_size(fp) for fp in file_paths]
+    return list(_get_io_executor().map(_file_size, file_paths))
+
+
+@dataclass(slots=True)
 class ChecklistItem:
     """
     Элемент чек-листа (FR-4.7)
@@ -36,7 +116,7 @@ class ChecklistItem:
     checked_by: Optional[str] = None
     checked_at: Optional[str] = None
     comment: str = ""
-    severity: str = "normal"  # normal, critical, warning
+    severity: str = ITEM_NORMAL  # normal, critical, warning
 
     def mark_checked(self, user: str, comment: str = "") -> None:
         """Отметить пункт как проверенный"""
@@ -46,10 +126,21 @@ class ChecklistItem:
         self.comment = comment
 
     def to_dict(self) -> Dict:
-        return asdict(self)
+        # Явный словарь вместо asdict(): без рекурсивного обхода и копирования полей
+        return {
+            "id": self.id,
+            "description": self.description,
+            "category": self.category,
+            "is_automatic": self.is_automatic,
+            "checked": self.checked,
+            "checked_by": self.checked_by,
+            "checked_at": self.checked_at,
+            "comment": self.comment,
+            "severity": self.severity,
+        }
 
 
-@dataclass
+@dataclass(slots=True)
 class ControlHistoryEntry:
     """
     Запись истории контроля (FR-4.8)
@@ -63,35 +154,110 @@ class ControlHistoryEntry:
     status_before: str
     status_after: str
     comment: str = ""
-    attachments: List[str] = field(default_factory=list)
+    # Вложения есть у немногих записей: по умолчанию общий пустой кортеж
+    # вместо нового списка на каждую запись (в JSON оба дают [])
+    attachments: Sequence[str] = ()
     time_spent_minutes: int = 0
 
+    def to_dict(self) -> Dict:
+        return {
+            "entry_id": self.entry_id,
+            "stage_name": self.stage_name,
+            "action": self.action,
+            "user_id": self.user_id,
+            "user_name": self.user_name,
+            "timestamp": self.timestamp,
+            "status_before": self.status_before,
+            "status_after": self.status_after,
+            "comment": self.comment,
+            "attachments": list(self.attachments),
+            "time_spent_minutes": self.time_spent_minutes,
+        }
+
 
 class ControlStage:
     """Базовый класс этапа контроля"""
 
+    __slots__ = (
+        "name",
+        "status",
+        "issues",
+        "checked_at",
+        "checklist",
+        "_by_id",
+        "_severity_mask",
+        "_checklist_version",
+        "_checklist_cache",
+        "_checklist_cache_version",
+    )
+
+    # Пункты чек-листа этапа; создаются один раз при загрузке класса,
+    # экземпляры этапа получают их копии
+    _CHECKLIST_TEMPLATE: ClassVar[Tuple[ChecklistItem, ...]] = ()
+
     def __init__(self, name: str):
         self.name = name
-        self.status = "pending"
-        self.issues = []
+        self.status = STATUS_PENDING
+        self.issues: List[Dict] = []
+        # Объединение флагов SEVERITY_* добавленных замечаний
+        self._severity_mask = 0
         self.checked_at = None
         self.checklist: List[ChecklistItem] = []
         self._init_checklist()
+        # Пункты заменяются только при инициализации, дальше меняются на месте
+        self._by_id: Dict[str, ChecklistItem] = {item.id: item for item in self.checklist}
+        # Версия чек-листа увеличивается при изменении пунктов через методы
+        # этапа и служит ключом актуальности кэша get_checklist
+        self._checklist_version = 0
+        self._checklist_cache: List[Dict] = []
+        self._checklist_cache_version = -1
 
     def _init_checklist(self) -> None:
-        """Инициализация чек-листа для этапа"""
-        pass
+        """Инициализация чек-листа для этапа копированием шаблона класса"""
+        self.checklist = [copy.copy(item) for item in self._CHECKLIST_TEMPLATE]
 
     def check(self, package: Dict) -> Dict:
+        """Выполнить проверку этапа и вернуть его результат"""
+        self._check(package)
+        return self.get_result()
+
+    def _check(self, package: Dict) -> None:
+        """Проверка пакета: обновляет статус и замечания этапа"""
         raise NotImplementedError()
 
+    def _manual_check(self, message: str) -> None:
+        """
+        Проверка этапа, пункты которого отмечаются вручную
+
+        Этап ожидает проверки, пока остаются неотмеченные пункты,
+        и пройден, когда отмечены все.
+        """
+        # Пункты ручных этапов могли быть отмечены вне методов этапа
+        self._checklist_version += 1
+        unchecked = sum(1 for item in self.checklist if not item.checked)
+        if unchecked:
+            self.status = STATUS_PENDING
+            self._add_issue(SEVERITY_INFO, f"{message} ({unchecked} пунктов)")
+        else:
+            self.status = STATUS_PASSED
+
+    def _reset_issues(self) -> None:
+        """Очистка замечаний перед новой проверкой"""
+        self.issues = []
+        self._severity_mask = 0
+
+    def _add_issue(self, severity: int, message: str) -> None:
+        """Добавить замечание с уровнем SEVERITY_*"""
+        self._severity_mask |= severity
+        self.issues.append({"severity": SEVERITY_NAMES[severity], "message": message})
+
     def get_result(self) -> Dict:
         return {
             "stage": self.name,
             "status": self.status,
             "issues": self.issues,
             "checked_at": self.checked_at,
-            "checklist": [item.to_dict() for item in self.checklist],
+            "checklist": self.get_checklist(),
             "checklist_completion": self._calculate_checklist_completion(),
         }
 
@@ -103,8 +269,18 @@ class ControlStage:
         return round(checked / len(self.checklist) * 100, 1)
 
     def get_checklist(self) -> List[Dict]:
-        """Получить чек-лист этапа"""
-        return [item.to_dict() for item in self.checklist]
+        """
+        Получить чек-лист этапа
+
+        Список пересобирается только после изменения пунктов методами
+        этапа (update_checklist_item, проверка этапа); результат общий
+        для вызывающих и не должен изменяться.
+        """
+        version = self._checklist_version
+        if self._checklist_cache_version != version:
+            self._checklist_cache = [item.to_dict() for item in self.checklist]
+            self._checklist_cache_version = version
+        return self._checklist_cache
 
     def update_checklist_item(
         self,
@@ -114,92 +290,93 @@ class ControlStage:
         comment: str = ""
     ) -> bool:
         """Обновить пункт чек-листа"""
-        for item in self.checklist:
-            if item.id == item_id:
-                if checked:
-                    item.mark_checked(user, comment)
-                else:
-                    item.checked = False
-                    item.checked_by = None
-                    item.checked_at = None
-                return True
-        return False
+        item = self._by_id.get(item_id)
+        if item is None:
+            return False
+        if checked:
+            item.mark_checked(user, comment)
+        else:
+            item.checked = False
+            item.checked_by = None
+            item.checked_at = None
+        # Версия увеличивается после записи, чтобы кэш, собранный
+        # одновременно с изменением, не считался актуальным
+        self._checklist_version += 1
+        return True
 
 
 class AutomaticControl(ControlStage):
     """FR-4.1.1: Автоматический контроль"""
 
+    __slots__ = ()
+
+    # Чек-лист автоматического контроля
+    _CHECKLIST_TEMPLATE = (
+        ChecklistItem(
+            id="auto_01",
+            description="Все обязательные документы предоставлены",
+            category="completeness",
+            is_automatic=True,
+            severity=ITEM_CRITICAL
+        ),
+        ChecklistItem(
+            id="auto_02",
+            description="Форматы файлов соответствуют требованиям",
+            category="format",
+            is_automatic=True
+        ),
+        ChecklistItem(
+            id="auto_03",
+            description="Размеры файлов в пределах лимитов",
+            category="format",
+            is_automatic=True
+        ),
+        ChecklistItem(
+            id="auto_04",
+            description="Документы не истекли",
+            category="validity",
+            is_automatic=True,
+            severity=ITEM_CRITICAL
+        ),
+        ChecklistItem(
+            id="auto_05",
+            description="Отсутствуют вирусы",
+            category="security",
+            is_automatic=True
+        ),
+        ChecklistItem(
+            id="auto_06",
+            description="Читаемость текста (для сканов)",
+            category="quality",
+            is_automatic=True
+        ),
+        ChecklistItem(
+            id="auto_07",
+            description="Подписи и печати присутствуют (если требуется)",
+            category="signatures",
+            is_automatic=False
+        ),
+        ChecklistItem(
+            id="auto_08",
+            description="Реквизиты актуальны",
+            category="requisites",
+            is_automatic=True
+        ),
+    )
+
     def __init__(self):
         super().__init__("Автоматический")
 
-    def _init_checklist(self) -> None:
-        """Чек-лист автоматического контроля"""
-        self.checklist = [
-            ChecklistItem(
-                id="auto_01",
-                description="Все обязательные документы предоставлены",
-                category="completeness",
-                is_automatic=True,
-                severity="critical"
-            ),
-            ChecklistItem(
-                id="auto_02",
-                description="Форматы файлов соответствуют требованиям",
-                category="format",
-                is_automatic=True
-            ),
-            ChecklistItem(
-                id="auto_03",
-                description="Размеры файлов в пределах лимитов",
-                category="format",
-                is_automatic=True
-            ),
-            ChecklistItem(
-                id="auto_04",
-                description="Документы не истекли",
-                category="validity",
-                is_automatic=True,
-                severity="critical"
-            ),
-            ChecklistItem(
-                id="auto_05",
-                description="Отсутствуют вирусы",
-                category="security",
-                is_automatic=True
-            ),
-            ChecklistItem(
-                id="auto_06",
-                description="Читаемость текста (для сканов)",
-                category="quality",
-                is_automatic=True
-            ),
-            ChecklistItem(
-                id="auto_07",
-                description="Подписи и печати присутствуют (если требуется)",
-                category="signatures",
-                is_automatic=False
-            ),
-            ChecklistItem(
-                id="auto_08",
-                description="Реквизиты актуальны",
-                category="requisites",
-                is_automatic=True
-            ),
-        ]
-
-    def check(self, package: Dict) -> Dict:
+    def _check(self, package: Dict) -> None:
         self.checked_at = datetime.now().isoformat()
-        self.issues = []
+        self._reset_issues()
 
         docs = package.get("documents", [])
         required = package.get("required_documents", [])
 
         # Проверка комплектности
         if len(docs) < len(required):
-            self.issues.append({
-                "severity": "blocker",
-                "message": f"Недостает документов: {len(required) - len(docs)}"
-            })
+            self._add_issue(SEVERITY_BLOCKER, f"Недостает документов: {len(required) - len(docs)}")
         else:
             self._mark_checklist_item("auto_01", True)
 
@@ -208,31 +385,23 @@ class AutomaticControl(ControlStage):
         all_sizes_ok = True
         all_valid = True
 
-        for doc in docs:
-            fp = doc.get("file_path")
-            if not fp or not Path(fp).exists():
-                self.issues.append({
-                    "severity": "critical",
-                    "message": f"Файл не найден: {doc.get('name')}"
-                })
+        # Размеры файлов (None — файла нет); один stat() на файл
+        sizes = _file_sizes([doc.get("file_path") for doc in docs])
+
+        for doc, size in zip(docs, sizes):
+            if size is None:
+                self._add_issue(SEVERITY_CRITICAL, f"Файл не найден: {doc.get('name')}")
                 all_formats_ok = False
                 continue
 
             # Проверка размера
-            size = Path(fp).stat().st_size
             if size > 50 * 1024 * 1024:
-                self.issues.append({
-                    "severity": "warning",
-                    "message": f"Файл слишком большой: {doc.get('name')}"
-                })
+                self._add_issue(SEVERITY_WARNING, f"Файл слишком большой: {doc.get('name')}")
                 all_sizes_ok = False
 
             # Проверка срока действия
             if doc.get("status") == "expired":
-                self.issues.append({
-                    "severity": "blocker",
-                    "message": f"Истек срок: {doc.get('name')}"
-                })
+                self._add_issue(SEVERITY_BLOCKER, f"Истек срок: {doc.get('name')}")
                 all_valid = False
 
         # Обновляем чек-лист
@@ -244,224 +413,188 @@ class AutomaticControl(ControlStage):
         self._mark_checklist_item("auto_08", True)  # Предполагаем актуальность реквизитов
 
         # Определение статуса
-        if any(i["severity"] == "blocker" for i in self.issues):
-            self.status = "failed"
-        elif any(i["severity"] == "critical" for i in self.issues):
-            self.status = "warning"
+        if self._severity_mask & SEVERITY_BLOCKER:
+            self.status = STATUS_FAILED
+        elif self._severity_mask & SEVERITY_CRITICAL:
+            self.status = STATUS_WARNING
         else:
-            self.status = "passed"
-
-        return self.get_result()
+            self.status = STATUS_PASSED
 
     def _mark_checklist_item(self, item_id: str, checked: bool) -> None:
         """Автоматическая отметка пункта чек-листа"""
-        for item in self.checklist:
-            if item.id == item_id:
-                if checked:
-                    item.mark_checked("system", "Автоматическая проверка")
-                break
+        item = self._by_id.get(item_id)
+        if item is not None and checked:
+            item.mark_checked("system", "Автоматическая проверка")
+            self._checklist_version += 1
 
 
 class LegalControl(ControlStage):
     """FR-4.1.2: Юридический контроль"""
 
+    __slots__ = ()
+
+    # Чек-лист юридического контроля
+    _CHECKLIST_TEMPLATE = (
+        ChecklistItem(
+            id="legal_01",
+            description="Соответствие учредительных документов законодательству",
+            category="compliance",
+            severity=ITEM_CRITICAL
+        ),
+        ChecklistItem(
+            id="legal_02",
+            description="Полномочия подписанта подтверждены",
+            category="authority",
+            severity=ITEM_CRITICAL
+        ),
+        ChecklistItem(
+            id="legal_03",
+            description="Отсутствие противоречий между документами",
+            category="consistency"
+        ),
+        ChecklistItem(
+            id="legal_04",
+            description="Соответствие требованиям закупки",
+            category="compliance",
+            severity=ITEM_CRITICAL
+        ),
+        ChecklistItem(
+            id="legal_05",
+            description="Корректность формулировок",
+            category="quality"
+        ),
+        ChecklistItem(
+            id="legal_06",
+            description="Наличие обязательных реквизитов",
+            category="requisites"
+        ),
+        ChecklistItem(
+            id="legal_07",
+            description="Соответствие срокам действия",
+            category="validity"
+        ),
+        ChecklistItem(
+            id="legal_08",
+            description="Отсутствие ограничений на участие",
+            category="restrictions",
+            severity=ITEM_CRITICAL
+        ),
+    )
+
     def __init__(self):
         super().__init__("Юридический")
 
-    def _init_checklist(self) -> None:
-        """Чек-лист юридического контроля"""
-        self.checklist = [
-            ChecklistItem(
-                id="legal_01",
-                description="Соответствие учредительных документов законодательству",
-                category="compliance",
-                severity="critical"
-            ),
-            ChecklistItem(
-                id="legal_02",
-                description="Полномочия подписанта подтверждены",
-                category="authority",
-                severity="critical"
-            ),
-            ChecklistItem(
-                id="legal_03",
-                description="Отсутствие противоречий между документами",
-                category="consistency"
-            ),
-            ChecklistItem(
-                id="legal_04",
-                description="Соответствие требованиям закупки",
-                category="compliance",
-                severity="critical"
-            ),
-            ChecklistItem(
-                id="legal_05",
-                description="Корректность формулировок",
-                category="quality"
-            ),
-            ChecklistItem(
-                id="legal_06",
-                description="Наличие обязательных реквизитов",
-                category="requisites"
-            ),
-            ChecklistItem(
-                id="legal_07",
-                description="Соответствие срокам действия",
-                category="validity"
-            ),
-            ChecklistItem(
-                id="legal_08",
-                description="Отсутствие ограничений на участие",
-                category="restrictions",
-                severity="critical"
-            ),
-        ]
-
-    def check(self, package: Dict) -> Dict:
+    def _check(self, package: Dict) -> None:
         self.checked_at = datetime.now().isoformat()
-        self.issues = []
+        self._reset_issues()
 
         # Юридический контроль требует ручной проверки
-        unchecked = [item for item in self.checklist if not item.checked]
-
-        if unchecked:
-            self.status = "pending"
-            self.issues.append({
-                "severity": "info",
-                "message": f"Требуется юридическая проверка ({len(unchecked)} пунктов)"
-            })
-        else:
-            # Все пункты проверены
-            critical_failed = [
-                item for item in self.checklist
-                if item.severity == "critical" and not item.checked
-            ]
-            if critical_failed:
-                self.status = "failed"
-            else:
-                self.status = "passed"
-
-        return self.get_result()
+        self._manual_check("Требуется юридическая проверка")
 
 
 class FinancialControl(ControlStage):
     """FR-4.1.3: Финансовый контроль"""
 
+    __slots__ = ()
+
+    # Чек-лист финансового контроля
+    _CHECKLIST_TEMPLATE = (
+        ChecklistItem(
+            id="fin_01",
+            description="Финансовые показатели соответствуют требованиям",
+            category="financial",
+            severity=ITEM_CRITICAL
+        ),
+        ChecklistItem(
+            id="fin_02",
+            description="Обеспечение заявки предоставлено",
+            category="security"
+        ),
+        ChecklistItem(
+            id="fin_03",
+            description="Расчетные счета активны",
+            category="accounts"
+        ),
+        ChecklistItem(
+            id="fin_04",
+            description="Отсутствие задолженностей подтверждено",
+            category="debts",
+            severity=ITEM_CRITICAL
+        ),
+        ChecklistItem(
+            id="fin_05",
+            description="Ценовое предложение корректно",
+            category="pricing",
+            severity=ITEM_CRITICAL
+        ),
+        ChecklistItem(
+            id="fin_06",
+            description="НДС учтен правильно",
+            category="taxes"
+        ),
+        ChecklistItem(
+            id="fin_07",
+            description="Нет признаков демпинга",
+            category="pricing"
+        ),
+    )
+
     def __init__(self):
         super().__init__("Финансовый")
 
-    def _init_checklist(self) -> None:
-        """Чек-лист финансового контроля"""
-        self.checklist = [
-            ChecklistItem(
-                id="fin_01",
-                description="Финансовые показатели соответствуют требованиям",
-                category="financial",
-                severity="critical"
-            ),
-            ChecklistItem(
-                id="fin_02",
-                description="Обеспечение заявки предоставлено",
-                category="security"
-            ),
-            ChecklistItem(
-                id="fin_03",
-                description="Расчетные счета активны",
-                category="accounts"
-            ),
-            ChecklistItem(
-                id="fin_04",
-                description="Отсутствие задолженностей подтверждено",
-                category="debts",
-                severity="critical"
-            ),
-            ChecklistItem(
-                id="fin_05",
-                description="Ценовое предложение корректно",
-                category="pricing",
-                severity="critical"
-            ),
-            ChecklistItem(
-                id="fin_06",
-                description="НДС учтен правильно",
-                category="taxes"
-            ),
-            ChecklistItem(
-                id="fin_07",
-                description="Нет признаков демпинга",
-                category="pricing"
-            ),
-        ]
-
-    def check(self, package: Dict) -> Dict:
+    def _check(self, package: Dict) -> None:
         self.checked_at = datetime.now().isoformat()
-        self.issues = []
-
-        unchecked = [item for item in self.checklist if not item.checked]
+        self._reset_issues()
 
-        if unchecked:
-            self.status = "pending"
-            self.issues.append({
-                "severity": "info",
-                "message": f"Требуется финансовая проверка ({len(unchecked)} пунктов)"
-            })
-        else:
-            self.status = "passed"
-
-        return self.get_result()
+        self._manual_check("Требуется финансовая проверка")
 
 
 class FinalControl(ControlStage):
     """FR-4.1.4: Итоговый контроль"""
 
+    __slots__ = ()
+
+    # Чек-лист итогового контроля
+    _CHECKLIST_TEMPLATE = (
+        ChecklistItem(
+            id="final_01",
+            description="Автоматический контроль пройден",
+            category="stages",
+            severity=ITEM_CRITICAL
+        ),
+        ChecklistItem(
+            id="final_02",
+            description="Юридический контроль пройден",
+            category="stages",
+            severity=ITEM_CRITICAL
+        ),
+        ChecklistItem(
+            id="final_03",
+            description="Финансовый контроль пройден",
+            category="stages",
+            severity=ITEM_CRITICAL
+        ),
+        ChecklistItem(
+            id="final_04",
+            description="Утверждение руководителя получено",
+            category="approval",
+            severity=ITEM_CRITICAL
+        ),
+    )
+
     def __init__(self):
         super().__init__("Итоговый")
 
-    def _init_checklist(self) -> None:
-        """Чек-лист итогового контроля"""
-        self.checklist = [
-            ChecklistItem(
-                id="final_01",
-                description="Автоматический контроль пройден",
-                category="stages",
-                severity="critical"
-            ),
-            ChecklistItem(
-                id="final_02",
-                description="Юридический контроль пройден",
-                category="stages",
-                severity="critical"
-            ),
-            ChecklistItem(
-                id="final_03",
-                description="Финансовый контроль пройден",
-                category="stages",
-                severity="critical"
-            ),
-            ChecklistItem(
-                id="final_04",
-                description="Утверждение руководителя получено",
-                category="approval",
-                severity="critical"
-            ),
-        ]
-
-    def check(self, package: Dict) -> Dict:
+    def _check(self, package: Dict) -> None:
         self.checked_at = datetime.now().isoformat()
-        self.issues = []
+        self._reset_issues()
 
-        unchecked = [item for item in self.checklist if not item.checked]
+        self._manual_check("Требуется утверждение руководителя")
 
-        if unchecked:
-            self.status = "pending"
-            self.issues.append({
-                "severity": "info",
-                "message": f"Требуется утверждение руководителя ({len(unchecked)} пунктов)"
-            })
-        else:
-            self.status = "passed"
 
-        return self.get_result()
+_TIME_SPENT = attrgetter("time_spent_minutes")
+_STAGE_NAME = attrgetter("stage_name")
+_ACTION = attrgetter("action")
 
 
 class ControlHistory:
@@ -487,7 +620,7 @@ class ControlHistory:
     ) -> ControlHistoryEntry:
         """Добавить запись в историю"""
         entry = ControlHistoryEntry(
-            entry_id=f"CHE-{datetime.now().strftime('%Y%m%d%H%M%S%f')}",
+            entry_id=f"CHE-{next(_entry_ids):013x}",
             stage_name=stage_name,
             action=action,
             user_id=user_id,
@@ -501,41 +634,73 @@ class ControlHistory:
         self.entries.append(entry)
         return entry
 
+    def bulk_add(self, entries_data: List[Dict]) -> None:
+        """
+        Добавить готовые записи (например, загруженные из файла)
+
+        Идентификаторы и отметки времени берутся из данных как есть.
+        """
+        self.entries.extend(ControlHistoryEntry(**data) for data in entries_data)
+
+    @classmethod
+    def from_file(cls, file_path: str) -> "ControlHistory":
+        """Загрузить историю, сохраненную методом save"""
+        path = Path(file_path)
+        history = cls(str(path.parent))
+        history.bulk_add(orjson.loads(path.read_bytes()))
+        return history
+
     def get_history(self, stage_name: Optional[str] = None) -> List[Dict]:
         """Получить историю контроля"""
         entries = self.entries
         if stage_name:
             entries = [e for e in entries if e.stage_name == stage_name]
-        return [asdict(e) for e in entries]
+        return [e.to_dict() for e in entries]
 
     def get_statistics(self) -> Dict[str, Any]:
         """Статистика по контролю"""
         if not self.entries:
             return {"total_entries": 0}
 
-        total_time = sum(e.time_spent_minutes for e in self.entries)
-        by_stage = {}
-        by_action = {}
-
-        for entry in self.entries:
-            by_stage[entry.stage_name] = by_stage.get(entry.stage_name, 0) + 1
-            by_action[entry.action] = by_action.get(entry.action, 0) + 1
+        # Подсчет целиком на стороне C: Counter по итератору map/attrgetter
+        # быстрее цикла с dict.get и Counter[key] += 1 на каждую запись
+        entries = self.entries
+        total_time = sum(map(_TIME_SPENT, entries))
 
         return {
-            "total_entries": len(self.entries),
+            "total_entries": len(entries),
             "total_time_minutes": total_time,
-            "average_time_minutes": round(total_time / len(self.entries), 1),
-            "by_stage": by_stage,
-            "by_action": by_action,
+            "average_time_minutes": round(total_time / len(entries), 1),
+            "by_stage": dict(Counter(map(_STAGE_NAME, entries))),
+            "by_action": dict(Counter(map(_ACTION, entries))),
         }
 
     def save(self, package_id: str) -> str:
         """Сохранить историю в файл"""
         file_path = self.storage_path / f"{package_id}_history.json"
-        with open(file_path, 'w', encoding='utf-8') as f:
-            json.dump(self.get_history(), f, ensure_ascii=False, indent=2)
+        # orjson сериализует dataclass-записи напрямую, без промежуточных словарей
+        file_path.write_bytes(orjson.dumps(self.entries, option=orjson.OPT_INDENT_2))
         return str(file_path)
 
+    async def save_async(self, package_id: str) -> str:
+        """Сохранить историю в файл, не блокируя event loop"""
+        return await asyncio.to_thread(self.save, package_id)
+
+    @staticmethod
+    def save_many(histories: List[Tuple[str, "ControlHistory"]]) -> List[str]:
+        """
+        Сохранить истории нескольких пакетов
+
+        Файлы записываются параллельно в общем пуле потоков ввода-вывода.
+
+        Args:
+            histories: Пары (идентификатор пакета, история)
+
+        Returns:
+            Пути к сохраненным файлам в порядке входных пар
+        """
+        return list(_get_io_executor().map(lambda item: item[1].save(item[0]), histories))
+
 
 class MultiStageController:
     """FR-4.5, FR-4.6: Контроллер многоэтапного контроля"""
@@ -548,15 +713,45 @@ class MultiStageController:
             FinalControl()
         ]
         self.history = ControlHistory()
+        # Этапы хранят состояние последней проверки и чек-листы, поэтому
+        # контроль, ручные изменения и чтение состояния этапов из разных
+        # потоков выполняются по очереди под этой блокировкой
+        self._lock = threading.Lock()
 
-    def execute_full_control(self, package: Dict, user_id: str = "system", user_name: str = "Система") -> Dict:
-        """Выполнить полный контроль пакета"""
+    def execute_full_control(
+        self,
+        package: Dict,
+        user_id: str = "system",
+        user_name: str = "Система",
+        summary_only: bool = False
+    ) -> Dict:
+        """
+        Выполнить полный контроль пакета
+
+        Args:
+            summary_only: Возвращать по этапам только название и статус,
+                          без замечаний и чек-листов
+        """
+        with self._lock:
+            return self._execute_full_control(package, user_id, user_name, summary_only)
+
+    def _execute_full_control(
+        self, package: Dict, user_id: str, user_name: str, summary_only: bool
+    ) -> Dict:
+        """Последовательное выполнение этапов; проверка прерывается на первом проваленном"""
         results = []
+        # Объединение флагов статусов пройденных этапов
+        status_flags = 0
 
         for stage in self.stages:
             status_before = stage.status
-            result = stage.check(package)
-            results.append(result)
+            if summary_only:
+                # Результат этапа с замечаниями и чек-листом не собирается
+                stage._check(package)
+                results.append({"stage": stage.name, "status": stage.status})
+            else:
+                results.append(stage.check(package))
+            status_flags |= _STAGE_STATUS_FLAGS.get(stage.status, 0)
 
             # Записываем в историю
             self.history.add_entry(
@@ -569,17 +764,17 @@ class MultiStageController:
                 comment=f"Автоматическая проверка этапа '{stage.name}'"
             )
 
-            if stage.status == "failed":
+            if stage.status == STATUS_FAILED:
                 logger.warning(f"Этап '{stage.name}' не пройден")
                 break
 
-        overall = "passed"
-        if any(r["status"] == "failed" for r in results):
-            overall = "failed"
-        elif any(r["status"] == "warning" for r in results):
-            overall = "warning"
-        elif any(r["status"] == "pending" for r in results):
-            overall = "pending"
+        overall = STATUS_PASSED
+        if status_flags & _STAGE_FAILED:
+            overall = STATUS_FAILED
+        elif status_flags & _STAGE_WARNING:
+            overall = STATUS_WARNING
+        elif status_flags & _STAGE_PENDING:
+            overall = STATUS_PENDING
 
         return {
             "overall_status": overall,
@@ -590,9 +785,10 @@ class MultiStageController:
 
     def get_stage_checklist(self, stage_index: int) -> List[Dict]:
         """Получить чек-лист этапа по индексу"""
-        if 0 <= stage_index < len(self.stages):
-            return self.stages[stage_index].get_checklist()
-        return []
+        with self._lock:
+            if 0 <= stage_index < len(self.stages):
+                return self.stages[stage_index].get_checklist()
+            return []
 
     def update_checklist_item(
         self,
@@ -604,23 +800,24 @@ class MultiStageController:
         comment: str = ""
     ) -> bool:
         """Обновить пункт чек-листа"""
-        if 0 <= stage_index < len(self.stages):
-            stage = self.stages[stage_index]
-            result = stage.update_checklist_item(item_id, checked, user_name, comment)
-
-            if result:
-                self.history.add_entry(
-                    stage_name=stage.name,
-                    action="checklist_update",
-                    user_id=user_id,
-                    user_name=user_name,
-                    status_before=stage.status,
-                    status_after=stage.status,
-                    comment=f"Обновлен пункт {item_id}: {'отмечен' if checked else 'снят'}"
-                )
-
-            return result
-        return False
+        with self._lock:
+            if 0 <= stage_index < len(self.stages):
+                stage = self.stages[stage_index]
+                result = stage.update_checklist_item(item_id, checked, user_name, comment)
+
+                if result:
+                    self.history.add_entry(
+                        stage_name=stage.name,
+                        action="checklist_update",
+                        user_id=user_id,
+                        user_name=user_name,
+                        status_before=stage.status,
+                        status_after=stage.status,
+                        comment=f"Обновлен пункт {item_id}: {'отмечен' if checked else 'снят'}"
+                    )
+
+                return result
+            return False
 
     def approve_stage(
         self,
@@ -630,33 +827,34 @@ class MultiStageController:
         comment: str = ""
     ) -> bool:
         """Утвердить этап"""
-        if 0 <= stage_index < len(self.stages):
-            stage = self.stages[stage_index]
-            status_before = stage.status
+        with self._lock:
+            if 0 <= stage_index < len(self.stages):
+                stage = self.stages[stage_index]
+                status_before = stage.status
 
-            # Проверяем, что все критические пункты чек-листа выполнены
-            critical_unchecked = [
-                item for item in stage.checklist
-                if item.severity == "critical" and not item.checked
-            ]
+                # Проверяем, что все критические пункты чек-листа выполнены
+                critical_unchecked = [
+                    item for item in stage.checklist
+                    if item.severity == ITEM_CRITICAL and not item.checked
+                ]
 
-            if critical_unchecked:
-                return False
+                if critical_unchecked:
+                    return False
 
-            stage.status = "passed"
+                stage.status = STATUS_PASSED
 
-            self.history.add_entry(
-                stage_name=stage.name,
-                action="approve",
-                user_id=user_id,
-                user_name=user_name,
-                status_before=status_before,
-                status_after=stage.status,
-                comment=comment or "Этап утвержден"
-            )
+                self.history.add_entry(
+                    stage_name=stage.name,
+                    action="approve",
+                    user_id=user_id,
+                    user_name=user_name,
+                    status_before=status_before,
+                    status_after=stage.status,
+                    comment=comment or "Этап утвержден"
+                )
 
-            return True
-        return False
+                return True
+            return False
 
     def reject_stage(
         self,
@@ -666,31 +864,34 @@ class MultiStageController:
         comment: str
     ) -> bool:
         """Отклонить этап"""
-        if 0 <= stage_index < len(self.stages):
-            stage = self.stages[stage_index]
-            status_before = stage.status
-            stage.status = "failed"
+        with self._lock:
+            if 0 <= stage_index < len(self.stages):
+                stage = self.stages[stage_index]
+                status_before = stage.status
+                stage.status = STATUS_FAILED
 
-            self.history.add_entry(
-                stage_name=stage.name,
-                action="reject",
-                user_id=user_id,
-                user_name=user_name,
-                status_before=status_before,
-                status_after=stage.status,
-                comment=comment
-            )
+                self.history.add_entry(
+                    stage_name=stage.name,
+                    action="reject",
+                    user_id=user_id,
+                    user_name=user_name,
+                    status_before=status_before,
+                    status_after=stage.status,
+                    comment=comment
+                )
 
-            return True
-        return False
+                return True
+            return False
 
     def get_all_checklists(self) -> Dict[str, List[Dict]]:
         """Получить все чек-листы"""
-        return {
-            stage.name: stage.get_checklist()
-            for stage in self.stages
-        }
+        with self._lock:
+            return {
+                stage.name: stage.get_checklist()
+                for stage in self.stages
+            }
 
     def get_control_history(self) -> List[Dict]:
         """Получить историю контроля"""
-        return self.history.get_history()
+        with self._lock:
+            return self.history.get_history()
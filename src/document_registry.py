@@ -10,9 +10,13 @@
 - Поиск и фильтрация
 """
 
+import bisect
 import logging
+import math
+import time
+from collections import OrderedDict, defaultdict
 from datetime import datetime, timedelta
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Set, Tuple
 from pathlib import Path
 import json
 
@@ -20,6 +24,25 @@ logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
+def _parse_expiry(document: Dict) -> Optional[datetime]:
+    """
+    Срок действия документа для индекса сроков
+    
+    Возвращает None для документов без срока, с некорректной датой
+    и с датой в другом часовом поясе (их нельзя сравнить с локальным временем).
+    """
+    try:
+        expiry = datetime.fromisoformat(document.get("expiry_date") or "")
+    except (ValueError, TypeError):
+        return None
+    return expiry if expiry.tzinfo is None else None
+
+
+def _trigrams(text: str) -> Set[str]:
+    """Множество триграмм строки"""
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
 class DocumentRegistry:
     """
     Реестр документов компании
@@ -27,6 +50,11 @@ class DocumentRegistry:
     Требования: FR-2.1 - FR-2.7
     """
 
+    # Размер кэша результатов поиска (LRU)
+    SEARCH_CACHE_SIZE = 128
+    # Интервал пересчета сохраненных статусов документов, секунды
+    STATUS_REFRESH_INTERVAL = 60
+
     def __init__(self, storage_path: Optional[str] = None):
         self.storage_path = Path(storage_path or "./storage/documents")
         self.storage_path.mkdir(parents=True, exist_ok=True)
@@ -34,6 +62,32 @@ class DocumentRegistry:
         self.documents: List[Dict] = []
         self.requisites: Dict = {}
         
+        # Инвертированные индексы: значение -> позиции документов в self.documents
+        self._by_category: Dict[Optional[str], Set[int]] = defaultdict(set)
+        self._by_tag: Dict[str, Set[int]] = defaultdict(set)
+        self._by_name_trigram: Dict[str, Set[int]] = defaultdict(set)
+        # Индекс сроков действия: (срок, позиция), упорядочен по сроку
+        self._expiry_index: List[Tuple[datetime, int]] = []
+        self._expiry_by_pos: Dict[int, datetime] = {}
+        
+        # Версия реестра увеличивается при каждом изменении и входит
+        # в ключ кэша поиска, поэтому устаревшие записи не используются
+        self._version = 0
+        self._search_cache: "OrderedDict[Tuple, List[Dict]]" = OrderedDict()
+        # Статусы вычисляются при добавлении документа и пересчитываются
+        # не чаще раза в STATUS_REFRESH_INTERVAL секунд
+        self._statuses_refreshed_at = time.monotonic()
+        
+    @property
+    def version(self) -> int:
+        """Номер версии реестра (меняется при каждом изменении)"""
+        return self._version
+    
+    def _touch(self) -> None:
+        """Отметка изменения реестра со сбросом кэша поиска"""
+        self._version += 1
+        self._search_cache.clear()
+    
     def add_document(self, document: Dict) -> str:
         """FR-2.2: Добавление документа"""
         doc_id = f"doc_{len(self.documents) + 1:04d}"
@@ -42,9 +96,58 @@ class DocumentRegistry:
         document["status"] = self._calculate_status(document)
         
         self.documents.append(document)
+        self._index_document(len(self.documents) - 1, document)
+        self._touch()
         logger.info(f"Документ {doc_id} добавлен")
         return doc_id
     
+    def _index_document(self, pos: int, document: Dict) -> None:
+        """Добавление документа в индексы по категории, тегам и названию"""
+        self._by_category[document.get("category")].add(pos)
+        for tag in document.get("tags") or ():
+            self._by_tag[tag].add(pos)
+        for trigram in _trigrams((document.get("name") or "").lower()):
+            self._by_name_trigram[trigram].add(pos)
+        self._index_expiry(pos, document)
+    
+    def _index_expiry(self, pos: int, document: Dict) -> None:
+        """Обновление позиции документа в индексе сроков действия"""
+        old = self._expiry_by_pos.pop(pos, None)
+        if old is not None:
+            del self._expiry_index[bisect.bisect_left(self._expiry_index, (old, pos))]
+        
+        expiry = _parse_expiry(document)
+        if expiry is not None:
+            bisect.insort(self._expiry_index, (expiry, pos))
+            self._expiry_by_pos[pos] = expiry
+    
+    def set_expiry_date(self, doc_id: str, expiry_date: Optional[str]) -> None:
+        """FR-2.3: Изменение срока действия документа с пересчетом статуса"""
+        for pos, doc in enumerate(self.documents):
+            if doc.get("id") == doc_id:
+                break
+        else:
+            raise ValueError(f"Документ не найден: {doc_id}")
+        
+        doc["expiry_date"] = expiry_date
+        doc["status"] = self._calculate_status(doc)
+        self._index_expiry(pos, doc)
+        self._touch()
+    
+    def refresh_statuses(self, force: bool = False) -> None:
+        """
+        FR-2.3: Пересчет сохраненных статусов документов
+        
+        Статус зависит от текущей даты; пересчет выполняется не чаще
+        раза в STATUS_REFRESH_INTERVAL секунд, если не указан force.
+        """
+        now = time.monotonic()
+        if not force and now - self._statuses_refreshed_at < self.STATUS_REFRESH_INTERVAL:
+            return
+        self._statuses_refreshed_at = now
+        for doc in self.documents:
+            doc["status"] = self._calculate_status(doc)
+    
     def _calculate_status(self, document: Dict) -> str:
         """FR-2.3: Расчет статуса документа"""
         if "expiry_date" not in document or not document["expiry_date"]:
@@ -67,20 +170,20 @@ class DocumentRegistry:
             return "unknown"
     
     def get_expiring_documents(self, days: int = 30) -> List[Dict]:
-        """FR-2.3: Получение истекающих документов"""
-        expiring = []
-        threshold = datetime.now() + timedelta(days=days)
+        """
+        FR-2.3: Получение истекающих документов
         
-        for doc in self.documents:
-            if "expiry_date" in doc and doc["expiry_date"]:
-                try:
-                    expiry = datetime.fromisoformat(doc["expiry_date"])
-                    if datetime.now() < expiry <= threshold:
-                        expiring.append(doc)
-                except (ValueError, TypeError):
-                    continue
-        
-        return expiring
+        Документы со сроком в интервале (сейчас, сейчас + days] выбираются
+        двоичным поиском по индексу сроков и возвращаются в порядке добавления.
+        """
+        now = datetime.now()
+        threshold = now + timedelta(days=days)
+        
+        index = self._expiry_index
+        start = bisect.bisect_right(index, (now, math.inf))
+        end = bisect.bisect_right(index, (threshold, math.inf), lo=start)
+        
+        return [self.documents[pos] for pos in sorted(pos for _, pos in index[start:end])]
     
     def search_documents(
         self,
@@ -90,28 +193,62 @@ class DocumentRegistry:
         tags: Optional[List[str]] = None
     ) -> List[Dict]:
         """FR-2.6, FR-2.7: Поиск и фильтрация"""
-        results = self.documents.copy()
+        key = (self._version, query, category, tuple(tags) if tags else None)
+        results = self._search_cache.get(key)
+        if results is None:
+            results = self._filter_documents(query, category, tags)
+            self._search_cache[key] = results
+            while len(self._search_cache) > self.SEARCH_CACHE_SIZE:
+                self._search_cache.popitem(last=False)
+        else:
+            self._search_cache.move_to_end(key)
         
-        if query:
-            query_lower = query.lower()
-            results = [
-                doc for doc in results
-                if query_lower in doc.get("name", "").lower()
-            ]
+        # Статус зависит от текущей даты, поэтому фильтр по нему
+        # применяется к закэшированной выборке при каждом вызове
+        # по сохраненным статусам, пересчитываемым раз в интервал
+        if status:
+            self.refresh_statuses()
+            return [doc for doc in results if doc.get("status") == status]
         
-        if category:
-            results = [doc for doc in results if doc.get("category") == category]
+        return list(results)
+    
+    def _filter_documents(
+        self,
+        query: Optional[str],
+        category: Optional[str],
+        tags: Optional[List[str]]
+    ) -> List[Dict]:
+        """
+        Фильтрация документов по запросу, категории и тегам
         
-        if status:
-            results = [
-                doc for doc in results
-                if self._calculate_status(doc) == status
-            ]
+        Кандидаты отбираются пересечением списков позиций из индексов;
+        полный просмотр выполняется только без фильтров или для
+        запроса короче трех символов.
+        """
+        postings: List[Set[int]] = []
+        
+        if category:
+            postings.append(self._by_category.get(category, set()))
         
         if tags:
+            postings.append(set().union(*(self._by_tag.get(tag, ()) for tag in tags)))
+        
+        query_lower = query.lower() if query else ""
+        for trigram in _trigrams(query_lower):
+            postings.append(self._by_name_trigram.get(trigram, set()))
+        
+        if postings:
+            postings.sort(key=len)
+            candidates = postings[0].intersection(*postings[1:])
+            results = [self.documents[pos] for pos in sorted(candidates)]
+        else:
+            results = self.documents.copy()
+        
+        # Триграммы только сужают выборку: вхождение запроса проверяется явно
+        if query_lower:
             results = [
                 doc for doc in results
-                if any(tag in doc.get("tags", []) for tag in tags)
+                if query_lower in doc.get("name", "").lower()
             ]
         
         return results
@@ -130,6 +267,7 @@ class DocumentRegistry:
             self.requisites["history"].append(old)
         
         self.requisites["current"] = requisites
+        self._touch()
         logger.info(f"Реквизиты обновлены (v{requisites['version']})")
     
     def get_current_requisites(self) -> Dict:
@@ -11,13 +11,38 @@
 
 import re
 import logging
-from typing import List, Dict, Optional, Any
+from typing import List, Dict, Optional, Any, Tuple
 from dataclasses import dataclass, field
 import uuid
 
 logger = logging.getLogger(__name__)
 
 
+def _union_pattern(patterns: List[str]) -> Tuple["re.Pattern", Dict[int, Tuple[int, Optional[int]]]]:
+    """
+    Объединение паттернов в одно регулярное выражение
+
+    Каждый паттерн становится отдельной группой альтернативы, поэтому
+    текст просматривается один раз вместо прохода на каждый паттерн.
+    Флаг (?i) в начале паттернов заменяется общим re.IGNORECASE.
+
+    Returns:
+        Скомпилированное выражение и словарь: номер группы альтернативы ->
+        (индекс паттерна, номер первой собственной группы паттерна или None)
+    """
+    alternatives = []
+    groups = {}
+    group_index = 1
+    for i, pattern in enumerate(patterns):
+        if pattern.startswith("(?i)"):
+            pattern = pattern[4:]
+        own_groups = re.compile(pattern).groups
+        alternatives.append(f"({pattern})")
+        groups[group_index] = (i, group_index + 1 if own_groups else None)
+        group_index += 1 + own_groups
+    return re.compile("|".join(alternatives), re.IGNORECASE), groups
+
+
 @dataclass
 class FormField:
     """Поле формы"""
@@ -130,41 +155,45 @@ class FormsExtractor:
     def _find_forms_in_section(self, text: str, section_name: str) -> List[Dict]:
         """Поиск форм в секции текста"""
         forms = []
-
-        for pattern in self.FORM_PATTERNS:
-            matches = re.finditer(pattern, text)
-
-            for match in matches:
-                form_id = f"FORM-{uuid.uuid4().hex[:8].upper()}"
-
-                # Определяем номер формы если есть
-                form_number = None
-                groups = match.groups()
-                if groups:
-                    form_number = groups[0]
-
-                # Определяем название формы
-                form_name = self._extract_form_name(text, match.start(), match.end())
-
-                # Извлекаем текст формы
-                raw_text = self._extract_form_text(text, match.start())
-
-                # Парсим структуру формы
-                structure = self.parse_form_structure(raw_text)
-
-                form = {
-                    "form_id": form_id,
-                    "form_name": form_name,
-                    "form_number": form_number,
-                    "source_section": section_name or "Не определено",
-                    "structure": structure,
-                    "raw_text": raw_text[:2000],  # Ограничиваем длину
-                    "template_match": None,
-                }
-
-                # Проверяем на дубликаты по названию
-                if not any(f["form_name"] == form_name for f in forms):
-                    forms.append(form)
+        seen_names = set()
+
+        # Один проход по тексту объединенным выражением; совпадения разных
+        # паттернов не пересекаются, а порядок обработки (по паттернам,
+        # затем по позиции) сохраняется сортировкой
+        alternatives = _FORM_ALTERNATIVES
+        matches = sorted(_FORM_RE.finditer(text), key=lambda m: alternatives[m.lastindex][0])
+
+        for match in matches:
+            # Определяем название формы
+            form_name = self._extract_form_name(text, match.start(), match.end())
+
+            # Дубликаты по названию отбрасываются до разбора текста формы
+            if form_name in seen_names:
+                continue
+            seen_names.add(form_name)
+
+            form_id = f"FORM-{uuid.uuid4().hex[:8].upper()}"
+
+            # Определяем номер формы если есть
+            number_group = alternatives[match.lastindex][1]
+            form_number = match.group(number_group) if number_group else None
+
+            # Извлекаем текст формы
+            raw_text = self._extract_form_text(text, match.start())
+
+            # Парсим структуру формы
+            structure = self.parse_form_structure(raw_text)
+
+            form = {
+                "form_id": form_id,
+                "form_name": form_name,
+                "form_number": form_number,
+                "source_section": section_name or "Не определено",
+                "structure": structure,
+                "raw_text": raw_text[:2000],  # Ограничиваем длину
+                "template_match": None,
+            }
+            forms.append(form)
 
         return forms
 
@@ -217,10 +246,15 @@ class FormsExtractor:
             Словарь со структурой формы
         """
         fields = []
+        seen_fields = set()
+        # Текст в нижнем регистре для поиска контекста полей (один раз на форму)
+        form_text_lower = form_text.lower()
 
         # Ищем поля формы
-        for pattern in self.FIELD_PATTERNS:
-            matches = re.finditer(pattern, form_text, re.MULTILINE)
+        # Паттерны полей совпадают в одних и тех же позициях, поэтому
+        # применяются по отдельности (скомпилированы заранее)
+        for pattern in _FIELD_RES:
+            matches = pattern.finditer(form_text)
 
             for match in matches:
                 groups = match.groups()
@@ -235,32 +269,48 @@ class FormsExtractor:
                 if len(field_name) < 3 or len(field_name) > 100:
                     continue
 
+                # Проверяем на дубликаты (без учета регистра)
+                field_key = field_name.casefold()
+                if field_key in seen_fields:
+                    continue
+                seen_fields.add(field_key)
+
                 # Определяем тип поля
                 field_type = self._detect_field_type(field_name)
 
                 # Определяем обязательность
-                mandatory = self._is_field_mandatory(field_name, form_text)
+                mandatory = self._is_field_mandatory(field_name, form_text_lower)
 
-                field_data = {
+                fields.append({
                     "name": field_name,
                     "type": field_type,
                     "mandatory": mandatory,
-                }
-
-                # Проверяем на дубликаты
-                if not any(f["name"].lower() == field_name.lower() for f in fields):
-                    fields.append(field_data)
+                })
 
         # Анализируем таблицы
         tables = self._extract_tables(form_text)
 
+        has_signature, has_date = self._detect_signature_and_date(form_text)
+
         return {
             "fields": fields[:50],  # Ограничиваем количество полей
             "tables_count": len(tables),
-            "has_signature": bool(re.search(r'(?i)подпись|печать|м\.?п\.?', form_text)),
-            "has_date": bool(re.search(r'(?i)дата|«\s*»\s*\d{4}', form_text)),
+            "has_signature": has_signature,
+            "has_date": has_date,
         }
 
+    def _detect_signature_and_date(self, text: str) -> Tuple[bool, bool]:
+        """Наличие мест для подписи/печати и даты (один проход по тексту)"""
+        has_signature = has_date = False
+        for match in _SIGNATURE_DATE_RE.finditer(text):
+            if match.lastgroup == "signature":
+                has_signature = True
+            else:
+                has_date = True
+            if has_signature and has_date:
+                break
+        return has_signature, has_date
+
     def _detect_field_type(self, field_name: str) -> str:
         """Определение типа поля по названию"""
         name_lower = field_name.lower()
@@ -276,18 +326,23 @@ class FormsExtractor:
 
         return "text"
 
-    def _is_field_mandatory(self, field_name: str, context: str) -> bool:
-        """Определение обязательности поля"""
+    def _is_field_mandatory(self, field_name: str, context_lower: str) -> bool:
+        """
+        Определение обязательности поля
+
+        Args:
+            field_name: Название поля
+            context_lower: Текст формы в нижнем регистре
+        """
         # Ищем контекст вокруг поля
-        field_pos = context.lower().find(field_name.lower())
+        field_pos = context_lower.find(field_name.lower())
         if field_pos == -1:
             return True  # По умолчанию обязательно
 
-        context_around = context[max(0, field_pos - 50):field_pos + len(field_name) + 50]
+        context_around = context_lower[max(0, field_pos - 50):field_pos + len(field_name) + 50]
 
         # Проверяем на опциональность
-        optional_markers = ["при наличии", "опционально", "по желанию", "(не обязательно)"]
-        return not any(marker in context_around.lower() for marker in optional_markers)
+        return not _OPTIONAL_MARKERS_RE.search(context_around)
 
     def _extract_tables(self, text: str) -> List[Dict]:
         """Извлечение информации о таблицах"""
@@ -372,3 +427,13 @@ class FormsExtractor:
             section = form.get("source_section", "Не определено")
             by_section[section] = by_section.get(section, 0) + 1
         return by_section
+
+
+_FORM_RE, _FORM_ALTERNATIVES = _union_pattern(FormsExtractor.FORM_PATTERNS)
+_FIELD_RES = tuple(re.compile(pattern, re.MULTILINE) for pattern in FormsExtractor.FIELD_PATTERNS)
+_OPTIONAL_MARKERS_RE = re.compile(
+    "|".join(map(re.escape, ["при наличии", "опционально", "по желанию", "(не обязательно)"]))
+)
+_SIGNATURE_DATE_RE = re.compile(
+    r'(?P<signature>подпись|печать|м\.?п\.?)|(?P<date>дата|«\s*»\s*\d{4})', re.IGNORECASE
+)
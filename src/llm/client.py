@@ -1,7 +1,21 @@
+import asyncio
 import os
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Iterator, Optional
 
 import httpx
+import orjson
+
+try:
+    # HTTP/2 в httpx требует пакет h2 (устанавливается с httpx[http2])
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+# Пул соединений асинхронного клиента: параллельные запросы
+# переиспользуют keep-alive соединения (или один HTTP/2-канал)
+MAX_KEEPALIVE_CONNECTIONS = 32
+MAX_CONNECTIONS = 64
 
 
 class OpenAILikeClient:
@@ -27,6 +41,8 @@ class OpenAILikeClient:
         self.timeout = timeout
 
         self._client = httpx.Client(base_url=self.base_url, timeout=self.timeout)
+        # Асинхронный клиент создается при первом асинхронном вызове
+        self._aclient: Optional[httpx.AsyncClient] = None
 
     def chat_completion(
         self,
@@ -40,10 +56,206 @@ class OpenAILikeClient:
     ) -> str:
         """Вызов /chat/completions и возврат текста ответа модели."""
 
+        payload = self._build_payload(
+            messages, temperature, top_p, max_tokens,
+            presence_penalty, frequency_penalty, response_format,
+        )
+
+        resp = self._client.post("/chat/completions", json=payload, headers=self._headers())
+        resp.raise_for_status()
+        data = resp.json()
+        return data["choices"][0]["message"]["content"]
+
+    def complete_many(
+        self,
+        prompts: List[List[Dict[str, str]]],
+        temperature: float = 0.7,
+        top_p: float = 0.9,
+        max_tokens: int = 2048,
+        presence_penalty: float = 0.6,
+        frequency_penalty: float = 0.8,
+        response_format: Optional[Dict[str, Any]] = None,
+    ) -> List[str]:
+        """Ответы на список диалогов; ответы в порядке входных диалогов.
+
+        Одинаковые диалоги отправляются одним запросом /chat/completions
+        с параметром n, поэтому контекст обрабатывается сервером один раз.
+        Каждый повтор получает отдельную выборку (как при отдельных вызовах
+        chat_completion), а не копию одного ответа: при temperature > 0
+        ответы на одинаковые диалоги различаются.
+
+        Raises:
+            ValueError: Сервер вернул не n вариантов (например, игнорирует n)
+        """
+
+        # Позиции каждого уникального диалога во входном списке
+        positions: Dict[bytes, List[int]] = {}
+        unique: List[List[Dict[str, str]]] = []
+        for i, messages in enumerate(prompts):
+            key = orjson.dumps(messages)
+            if key not in positions:
+                positions[key] = []
+                unique.append(messages)
+            positions[key].append(i)
+
+        results: List[str] = [""] * len(prompts)
+        for messages, indexes in zip(unique, positions.values()):
+            payload = self._build_payload(
+                messages, temperature, top_p, max_tokens,
+                presence_penalty, frequency_penalty, response_format,
+            )
+            if len(indexes) > 1:
+                payload["n"] = len(indexes)
+
+            resp = self._client.post("/chat/completions", json=payload, headers=self._headers())
+            resp.raise_for_status()
+            choices = sorted(resp.json()["choices"], key=lambda c: c.get("index", 0))
+            if len(choices) != len(indexes):
+                raise ValueError(
+                    f"Сервер вернул {len(choices)} вариантов ответа вместо {len(indexes)} (параметр n)"
+                )
+            for i, choice in zip(indexes, choices):
+                results[i] = choice["message"]["content"]
+
+        return results
+
+    def complete_prompts(
+        self,
+        prompts: List[str],
+        temperature: float = 0.7,
+        top_p: float = 0.9,
+        max_tokens: int = 2048,
+        presence_penalty: float = 0.6,
+        frequency_penalty: float = 0.8,
+    ) -> List[str]:
+        """Пакетное дополнение готовых текстовых промптов одним запросом /completions.
+
+        Список промптов в поле prompt поддерживается vLLM и OpenAI-совместимыми
+        серверами; шаблон чата к промптам не применяется.
+        """
+
+        payload: Dict[str, Any] = {
+            "model": self.model,
+            "prompt": prompts,
+            "temperature": temperature,
+            "top_p": top_p,
+            "max_tokens": max_tokens,
+            "presence_penalty": presence_penalty,
+            "frequency_penalty": frequency_penalty,
+        }
+
+        resp = self._client.post("/completions", json=payload, headers=self._headers())
+        resp.raise_for_status()
+        results: List[str] = [""] * len(prompts)
+        for choice in resp.json()["choices"]:
+            results[choice["index"]] = choice["text"]
+        return results
+
+    async def achat_completion(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: float = 0.7,
+        top_p: float = 0.9,
+        max_tokens: int = 2048,
+        presence_penalty: float = 0.6,
+        frequency_penalty: float = 0.8,
+        response_format: Optional[Dict[str, Any]] = None,
+    ) -> str:
+        """Асинхронный вызов /chat/completions; не блокирует event loop на время генерации."""
+
+        payload = self._build_payload(
+            messages, temperature, top_p, max_tokens,
+            presence_penalty, frequency_penalty, response_format,
+        )
+
+        resp = await self._get_aclient().post(
+            "/chat/completions", json=payload, headers=self._headers()
+        )
+        resp.raise_for_status()
+        data = resp.json()
+        return data["choices"][0]["message"]["content"]
+
+    async def batch_chat(
+        self,
+        messages_list: List[List[Dict[str, str]]],
+        **kwargs: Any,
+    ) -> List[str]:
+        """Параллельные вызовы achat_completion; ответы в порядке входных сообщений.
+
+        Дополнительные аргументы передаются в каждый вызов achat_completion.
+        """
+        return list(await asyncio.gather(
+            *(self.achat_completion(messages, **kwargs) for messages in messages_list)
+        ))
+
+    async def aclose(self) -> None:
+        """Закрыть соединения асинхронного клиента."""
+        if self._aclient is not None:
+            await self._aclient.aclose()
+            self._aclient = None
+
+    def chat_completion_stream(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: float = 0.7,
+        top_p: float = 0.9,
+        max_tokens: int = 2048,
+        presence_penalty: float = 0.6,
+        frequency_penalty: float = 0.8,
+        response_format: Optional[Dict[str, Any]] = None,
+    ) -> Iterator[str]:
+        """Вызов /chat/completions с stream=true; отдает фрагменты текста по мере генерации (SSE)."""
+
+        payload = self._build_payload(
+            messages, temperature, top_p, max_tokens,
+            presence_penalty, frequency_penalty, response_format,
+        )
+        payload["stream"] = True
+
+        with self._client.stream(
+            "POST", "/chat/completions", json=payload, headers=self._headers()
+        ) as resp:
+            resp.raise_for_status()
+            for line in resp.iter_lines():
+                if not line.startswith("data:"):
+                    continue
+                data = line[len("data:"):].strip()
+                if data == "[DONE]":
+                    break
+                choices = orjson.loads(data).get("choices") or [{}]
+                content = choices[0].get("delta", {}).get("content")
+                if content:
+                    yield content
+
+    def _get_aclient(self) -> httpx.AsyncClient:
+        if self._aclient is None:
+            self._aclient = httpx.AsyncClient(
+                base_url=self.base_url,
+                timeout=self.timeout,
+                http2=HTTP2_AVAILABLE,
+                limits=httpx.Limits(
+                    max_keepalive_connections=MAX_KEEPALIVE_CONNECTIONS,
+                    max_connections=MAX_CONNECTIONS,
+                ),
+            )
+        return self._aclient
+
+    def _headers(self) -> Dict[str, str]:
         headers: Dict[str, str] = {}
         if self.api_key:
             headers["Authorization"] = f"Bearer {self.api_key}"
+        return headers
 
+    def _build_payload(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: float,
+        top_p: float,
+        max_tokens: int,
+        presence_penalty: float,
+        frequency_penalty: float,
+        response_format: Optional[Dict[str, Any]],
+    ) -> Dict[str, Any]:
         payload: Dict[str, Any] = {
             "model": self.model,
             "messages": messages,
@@ -58,7 +270,4 @@ class OpenAILikeClient:
             # Например: {"type": "json_object"} для строгого JSON-вывода
             payload["response_format"] = response_format
 
-        resp = self._client.post("/chat/completions", json=payload, headers=headers)
-        resp.raise_for_status()
-        data = resp.json()
-        return data["choices"][0]["message"]["content"]
+        return payload
@@ -10,7 +10,6 @@
 """
 
 import logging
-import shutil
 from typing import List, Dict, Optional
 from pathlib import Path
 from datetime import datetime
@@ -66,19 +65,14 @@ class PackageBuilder:
     def build_package(self, procurement_id: str, matched: List[Dict]) -> str:
         """FR-3.6, FR-3.7: Формирование пакета"""
         ts = datetime.now().strftime("%Y%m%d_%H%M%S")
-        pkg_dir = self.output_dir / f"{procurement_id}_{ts}"
-        pkg_dir.mkdir(parents=True, exist_ok=True)
-        
-        for idx, item in enumerate(matched, 1):
-            fp = item.get("matched", {}).get("file_path")
-            if fp and Path(fp).exists():
-                shutil.copy2(fp, pkg_dir / f"{idx:02d}_{Path(fp).name}")
         
+        # Файлы пишутся в архив напрямую из исходного места,
+        # без копирования во временный каталог пакета
         zip_path = self.output_dir / f"{procurement_id}_{ts}.zip"
         with zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
-            for f in pkg_dir.rglob('*'):
-                if f.is_file():
-                    zipf.write(f, f.relative_to(pkg_dir))
+            for idx, item in enumerate(matched, 1):
+                fp = item.get("matched", {}).get("file_path")
+                if fp and Path(fp).is_file():
+                    zipf.write(fp, f"{idx:02d}_{Path(fp).name}")
         
-        shutil.rmtree(pkg_dir)
         return str(zip_path)
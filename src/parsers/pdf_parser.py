@@ -122,7 +122,7 @@ class PDFParser(BaseParser):
     
     def _extract_text_pypdf(self, file_path: Path) -> str:
         """Извлечение текста с помощью PyPDF2"""
-        text = ""
+        parts = []
         try:
             with open(file_path, 'rb') as file:
                 pdf_reader = PyPDF2.PdfReader(file)
@@ -130,13 +130,13 @@ class PDFParser(BaseParser):
                 for page_num, page in enumerate(pdf_reader.pages, 1):
                     page_text = page.extract_text()
                     if page_text:
-                        text += f"\n--- Страница {page_num} ---\n"
-                        text += page_text
+                        parts.append(f"\n--- Страница {page_num} ---\n")
+                        parts.append(page_text)
         
         except Exception as e:
             self.logger.warning(f"Ошибка извлечения текста PyPDF2: {e}")
         
-        return text
+        return "".join(parts)
     
     def _extract_text_ocr(self, file_path: Path) -> str:
         """
@@ -8,6 +8,8 @@
 
 import hashlib
 import json
+import os
+import tempfile
 from typing import Any, Optional, Dict
 from pathlib import Path
 import logging
@@ -30,7 +32,7 @@ class CacheManager:
             ttl_hours: Время жизни кэша в часах
         """
         self.cache_dir = Path(cache_dir)
-        self.cache_dir.mkdir(exist_ok=True)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
         self.ttl = timedelta(hours=ttl_hours)
 
     def get(self, key: str) -> Optional[Any]:
@@ -45,14 +47,18 @@ class CacheManager:
         """
         cache_file = self._get_cache_file(key)
 
-        if not cache_file.exists():
+        # Файл может удалить другой процесс между проверками, поэтому
+        # отсутствие файла обрабатывается через исключение
+        try:
+            mtime = cache_file.stat().st_mtime
+        except FileNotFoundError:
             return None
 
         # Проверка срока действия
-        file_time = datetime.fromtimestamp(cache_file.stat().st_mtime)
+        file_time = datetime.fromtimestamp(mtime)
         if datetime.now() - file_time > self.ttl:
             logger.debug(f"Кэш устарел: {key}")
-            cache_file.unlink()
+            cache_file.unlink(missing_ok=True)
             return None
 
         try:
@@ -72,6 +78,10 @@ class CacheManager:
         """
         Сохранение значения в кэш
 
+        Файл записывается во временный файл и атомарно переименовывается,
+        поэтому читатели (в том числе другие процессы) не видят
+        частично записанный JSON.
+
         Args:
             key: Ключ
             value: Значение (должно быть JSON-сериализуемым)
@@ -79,18 +89,27 @@ class CacheManager:
         cache_file = self._get_cache_file(key)
 
         try:
-            with open(cache_file, 'w', encoding='utf-8') as f:
-                json.dump(value, f, ensure_ascii=False, indent=2)
-            logger.debug(f"Кэш сохранен: {key}")
+            data = json.dumps(value, ensure_ascii=False, indent=2)
         except TypeError as e:
             logger.error(f"Значение не сериализуемо в JSON: {e}")
+            return
+
+        tmp_path = None
+        try:
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                f.write(data)
+            os.replace(tmp_path, cache_file)
+            logger.debug(f"Кэш сохранен: {key}")
         except Exception as e:
             logger.error(f"Ошибка записи кэша: {e}")
+            if tmp_path is not None:
+                Path(tmp_path).unlink(missing_ok=True)
 
     def clear(self) -> None:
         """Очистка всего кэша"""
         for cache_file in self.cache_dir.glob("*.cache"):
-            cache_file.unlink()
+            cache_file.unlink(missing_ok=True)
         logger.info("Кэш очищен")
 
     def _get_cache_file(self, key: str) -> Path:
@@ -4,13 +4,26 @@
 Модуль дедупликации документов
 """
 
+import math
 import re
+from collections import Counter, defaultdict
 from typing import List, Dict, Any
 import logging
 from difflib import SequenceMatcher
 
+try:
+    # C-реализация того же коэффициента (Indel), что и Levenshtein.ratio
+    from rapidfuzz import fuzz, process
+except ImportError:
+    fuzz = process = None
+
 logger = logging.getLogger(__name__)
 
+_WS_RE = re.compile(r'\s+')
+_SPECIAL_CHARS_RE = re.compile(r'[^\w\sа-яё]')
+_STOP_WORDS = frozenset({'копия', 'оригинал', 'заверенная', 'нотариальная'})
+_QGRAM = 3  # Длина символьной n-граммы для предфильтра
+
 
 class DocumentDeduplicator:
     """
@@ -38,7 +51,15 @@ class DocumentDeduplicator:
             return []
         
         unique_docs = []
+        unique_names: List[str] = []
         seen_names = set()
+        # Инвертированный индекс: триграмма -> {номер оставленного названия: число вхождений}
+        gram_index: Dict[str, Dict[int, int]] = defaultdict(dict)
+
+        # Один matcher на весь проход: SequenceMatcher кэширует индекс seq2,
+        # поэтому новое название ставится в seq2 и сравнивается с уже
+        # оставленными через set_seq1
+        matcher = SequenceMatcher(autojunk=False)
         
         for doc in documents:
             doc_name = doc.get("name", "")
@@ -51,28 +72,39 @@ class DocumentDeduplicator:
                 logger.debug(f"Удален точный дубликат: {doc_name}")
                 continue
             
-            # Проверка схожести с уже добавленными
-            is_duplicate = False
-            for existing_doc in unique_docs:
-                existing_name = self._normalize_document_name(
-                    existing_doc.get("name", "")
+            # Число общих триграмм с каждым оставленным названием
+            grams = Counter(
+                normalized_name[i:i + _QGRAM]
+                for i in range(len(normalized_name) - _QGRAM + 1)
+            )
+            shared_grams: Dict[int, int] = defaultdict(int)
+            for gram, count in grams.items():
+                for index, existing_count in gram_index.get(gram, {}).items():
+                    shared_grams[index] += min(count, existing_count)
+            
+            candidates = [
+                existing_name
+                for index, existing_name in enumerate(unique_names)
+                if self._may_be_similar(
+                    len(normalized_name), len(existing_name), shared_grams.get(index, 0)
                 )
-                
-                similarity = self._calculate_similarity(
-                    normalized_name, existing_name
+            ]
+            
+            # Проверка схожести с уже добавленными
+            similarity = self._best_similarity(normalized_name, candidates, matcher)
+            if similarity >= self.similarity_threshold:
+                logger.debug(
+                    f"Удален похожий дубликат: {doc_name} "
+                    f"(схожесть {similarity:.2%})"
                 )
-                
-                if similarity >= self.similarity_threshold:
-                    logger.debug(
-                        f"Удален похожий дубликат: {doc_name} "
-                        f"(схожесть {similarity:.2%})"
-                    )
-                    is_duplicate = True
-                    break
+                continue
             
-            if not is_duplicate:
-                unique_docs.append(doc)
-                seen_names.add(normalized_name)
+            index = len(unique_names)
+            for gram, count in grams.items():
+                gram_index[gram][index] = count
+            unique_docs.append(doc)
+            unique_names.append(normalized_name)
+            seen_names.add(normalized_name)
         
         removed_count = len(documents) - len(unique_docs)
         if removed_count > 0:
@@ -94,18 +126,86 @@ class DocumentDeduplicator:
         name = name.lower().strip()
         
         # Удаление лишних пробелов
-        name = re.sub(r'\s+', ' ', name)
+        name = _WS_RE.sub(' ', name)
         
         # Удаление спецсимволов
-        name = re.sub(r'[^\w\sа-яё]', '', name)
+        name = _SPECIAL_CHARS_RE.sub('', name)
         
         # Удаление стоп-слов
-        stop_words = ['копия', 'оригинал', 'заверенная', 'нотариальная']
         words = name.split()
-        words = [w for w in words if w not in stop_words]
+        words = [w for w in words if w not in _STOP_WORDS]
         
         return ' '.join(words)
     
+    def _may_be_similar(self, len1: int, len2: int, shared_grams: int) -> bool:
+        """
+        Быстрая проверка, может ли схожесть пары достичь порога
+
+        ratio = 2*M/(len1+len2), где M не больше длины общей подпоследовательности,
+        поэтому ratio <= 2*min(len1, len2)/(len1+len2). Кроме того, при ratio >= порога
+        строки различаются не более чем на k = len1+len2-2*M правок, а k правок
+        разрушают не более 3*k триграмм: общих триграмм остается не меньше
+        max(len1, len2) - 2 - 3*k. Обе оценки точные, пропусков дубликатов нет.
+        
+        Returns:
+            False, если пара заведомо ниже порога
+        """
+        total = len1 + len2
+        if 2 * min(len1, len2) < self.similarity_threshold * total:
+            return False
+        min_matches = math.ceil(self.similarity_threshold * total / 2)
+        max_edits = total - 2 * min_matches
+        return shared_grams >= max(len1, len2) - (_QGRAM - 1) - _QGRAM * max_edits
+    
+    def _best_similarity(
+        self, name: str, candidates: List[str], matcher: SequenceMatcher
+    ) -> float:
+        """
+        Наибольшая схожесть названия с кандидатами
+        
+        С rapidfuzz все кандидаты сравниваются одним вызовом process.extractOne
+        (цикл на C); без него — через SequenceMatcher до первого совпадения
+        выше порога.
+        
+        Returns:
+            Коэффициент схожести (0-1); 0, если кандидатов нет
+        """
+        if not candidates:
+            return 0.0
+        
+        if process is not None:
+            _, score, _ = process.extractOne(name, candidates, scorer=fuzz.ratio)
+            return score / 100
+        
+        best = 0.0
+        matcher.set_seq2(name)
+        for candidate in candidates:
+            matcher.set_seq1(candidate)
+            similarity = self._matcher_similarity(matcher)
+            if similarity >= self.similarity_threshold:
+                return similarity
+            best = max(best, similarity)
+        return best
+    
+    def _matcher_similarity(self, matcher: SequenceMatcher) -> float:
+        """
+        Схожесть пары строк, уже загруженных в matcher
+
+        real_quick_ratio (O(1), по длинам) и quick_ratio (O(n), по составу
+        символов) — верхние оценки ratio. Если любая из них ниже порога,
+        дорогой ratio() не вызывается.
+        
+        Returns:
+            Коэффициент схожести (0-1) или верхняя оценка ниже порога
+        """
+        upper_bound = matcher.real_quick_ratio()
+        if upper_bound < self.similarity_threshold:
+            return upper_bound
+        upper_bound = matcher.quick_ratio()
+        if upper_bound < self.similarity_threshold:
+            return upper_bound
+        return matcher.ratio()
+    
     def _calculate_similarity(self, str1: str, str2: str) -> float:
         """
         Расчет схожести двух строк
@@ -117,4 +217,6 @@ class DocumentDeduplicator:
         Returns:
             Коэффициент схожести (0-1)
         """
+        if fuzz is not None:
+            return fuzz.ratio(str1, str2) / 100
         return SequenceMatcher(None, str1, str2).ratio()
@@ -13,11 +13,18 @@
 Дата: 2026-01-15
 """
 
+import asyncio
+import os
+import tempfile
 import unittest
 import json
 import uuid
 from unittest.mock import MagicMock
+
+import httpx
+
 from src.analyzer import DocumentAnalyzer
+from src.llm.client import OpenAILikeClient
 
 
 class TestDocumentAnalyzer(unittest.TestCase):
@@ -114,18 +121,170 @@ class TestDocumentAnalyzer(unittest.TestCase):
         self.mock_client.chat_completion.return_value = json.dumps(response)
         
         # Вызываем analyze, который должен применить лимит
-        result = self.analyzer.analyze("some text")
+        result = self.analyzer.analyze("Закупка № TEST-001. Требования к заявке: см. приложение к документации")
         
         # Проверка, что не больше MAX_DOCUMENTS
         self.assertLessEqual(len(result["required_documents"]), self.analyzer.MAX_DOCUMENTS)
         self.assertEqual(len(result["required_documents"]), 50)
     
+    def test_result_cache(self):
+        """Тест кэширования результата анализа"""
+        test_doc = "Закупка № TEST-001\nТребования к заявке: выписка из ЕГРЮЛ, устав, лицензия"
+
+        first = self.analyzer.analyze(test_doc)
+        first["required_documents"].clear()
+        second = self.analyzer.analyze("  " + test_doc.replace("\n", "   "))
+
+        # Повторный запрос не обращается к LLM и не зависит от мутаций первого результата
+        self.assertEqual(self.mock_client.chat_completion.call_count, 1)
+        self.assertEqual(second["total_count"], 3)
+        self.assertEqual(len(second["required_documents"]), 3)
+
+        self.analyzer.analyze(test_doc, provided_docs=["Устав"])
+        self.assertEqual(self.mock_client.chat_completion.call_count, 2)
+
+    def test_shared_result_cache(self):
+        """Тест общего кэша результатов между экземплярами анализатора"""
+        from src.utils.cache_manager import CacheManager
+
+        test_doc = "Закупка № TEST-001\nТребования к заявке: выписка из ЕГРЮЛ, устав, лицензия"
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            first = DocumentAnalyzer(
+                llm_client=self.mock_client, model_size="small", result_cache=CacheManager(tmp_dir)
+            )
+            second = DocumentAnalyzer(
+                llm_client=self.mock_client, model_size="small", result_cache=CacheManager(tmp_dir)
+            )
+
+            expected = first.analyze(test_doc)
+            result = second.analyze(test_doc)
+
+        # Второй экземпляр (другой процесс) не обращается к LLM
+        self.assertEqual(self.mock_client.chat_completion.call_count, 1)
+        self.assertEqual(result, expected)
+
+    def test_prompt_prefix_is_stable(self):
+        """Тест неизменности префикса промпта (prefix caching на стороне vLLM)"""
+        self.analyzer.analyze("Закупка № 1. Требуется выписка из ЕГРЮЛ и копия устава организации")
+        self.analyzer.analyze(
+            "Закупка № 2. Требуется лицензия и бухгалтерский баланс за последний год",
+            provided_docs=["Лицензия"],
+        )
+
+        first, second = (
+            call.kwargs["messages"] for call in self.mock_client.chat_completion.call_args_list
+        )
+
+        # Системное сообщение побайтно совпадает и не содержит данных запроса
+        self.assertEqual(first[0], second[0])
+        self.assertNotIn("Закупка №", first[0]["content"])
+
+        # Данные запроса идут только после общего заголовка пользовательского сообщения
+        header = "\nЗакупочная документация:\n"
+        self.assertTrue(first[1]["content"].startswith(header))
+        self.assertTrue(second[1]["content"].startswith(header))
+
+    def test_analyze_stream(self):
+        """Тест потокового анализа"""
+        response = json.dumps(self.default_response)
+        self.mock_client.chat_completion_stream.return_value = iter([response[:20], response[20:]])
+
+        test_doc = "Закупка № TEST-001. Требования к заявке: выписка из ЕГРЮЛ, устав, лицензия"
+        events = list(self.analyzer.analyze_stream(test_doc))
+
+        self.assertEqual([event["type"] for event in events], ["chunk", "chunk", "result"])
+        self.assertEqual("".join(event["content"] for event in events[:2]), response)
+        self.assertEqual(events[-1]["data"]["total_count"], 3)
+
+        # Повторный запрос отдается из кэша без фрагментов
+        events = list(self.analyzer.analyze_stream(test_doc))
+        self.assertEqual([event["type"] for event in events], ["result"])
+        self.assertEqual(self.mock_client.chat_completion_stream.call_count, 1)
+
+    def test_pdf_extraction_page_order(self):
+        """Тест извлечения текста многостраничного PDF в порядке страниц"""
+        import pymupdf
+
+        pages = 17
+        pdf = pymupdf.open()
+        for i in range(pages):
+            pdf.new_page().insert_text((72, 72), f"Page {i}")
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            file_path = os.path.join(tmp_dir, "test.pdf")
+            pdf.save(file_path)
+            text = self.analyzer.extract_text_from_pdf(file_path)
+
+        # Порядок страниц сохраняется
+        self.assertEqual([line for line in text.split("\n") if line], [f"Page {i}" for i in range(pages)])
+
+    def test_pdf_extraction_keeps_pages_before_error(self):
+        """Тест: ошибка на странице PDF не отбрасывает уже извлеченный текст"""
+        import pymupdf
+        from unittest.mock import patch
+
+        pdf = pymupdf.open()
+        for i in range(5):
+            pdf.new_page().insert_text((72, 72), f"Page {i}")
+
+        original_get_text = pymupdf.Page.get_text
+
+        def get_text(page, *args, **kwargs):
+            if page.number == 3:
+                raise RuntimeError("broken page")
+            return original_get_text(page, *args, **kwargs)
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            file_path = os.path.join(tmp_dir, "test.pdf")
+            pdf.save(file_path)
+            with patch.object(pymupdf.Page, "get_text", get_text):
+                text = self.analyzer.extract_text_from_pdf(file_path)
+
+        self.assertEqual([line for line in text.split("\n") if line], ["Page 0", "Page 1", "Page 2"])
+
+    def test_pdf_extraction_char_limit(self):
+        """Тест извлечения начала и конца PDF в пределах лимита текста"""
+        import pymupdf
+
+        pdf = pymupdf.open()
+        for i in range(30):
+            pdf.new_page().insert_text((72, 72), f"Page {i:02d}")
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            file_path = os.path.join(tmp_dir, "test.pdf")
+            pdf.save(file_path)
+            text = self.analyzer.extract_text_from_pdf(file_path, max_chars=40)
+
+        lines = [line for line in text.split("\n") if line]
+        self.assertEqual(lines, ["Page 00", "Page 01", "Page 02", "[...]", "Page 27", "Page 28", "Page 29"])
+        self.assertIn("\n\n[...]\n\n", text)
+
     def test_empty_input(self):
         """Тест пустого ввода"""
         result = self.analyzer.analyze("")
         
         self.assertIn("required_documents", result)
         self.assertEqual(len(result["required_documents"]), 0)
+
+    def test_short_input_skips_llm(self):
+        """Тест короткого ввода: LLM не вызывается"""
+        result = self.analyzer.analyze("   Закупка № 1\n\n\n   ")
+
+        self.assertEqual(result["total_count"], 0)
+        self.mock_client.chat_completion.assert_not_called()
+    
+    def test_analyze_batch(self):
+        """Тест пакетного анализа: одинаковые тексты анализируются один раз"""
+        text_a = "Закупка № A-1. Требуется выписка из ЕГРЮЛ и копия устава организации."
+        text_b = "Закупка № B-2. Требуется лицензия и бухгалтерская отчетность за год."
+        
+        results = self.analyzer.analyze_batch([text_a, text_b, text_a])
+        
+        self.assertEqual(len(results), 3)
+        self.assertEqual(self.mock_client.chat_completion.call_count, 2)
+        self.assertEqual(results[0], results[2])
+        self.assertIsNot(results[0], results[2])
     
     def test_generation_params_small_model(self):
         """Тест параметров для малой модели"""
@@ -154,18 +313,18 @@ class TestDocumentAnalyzer(unittest.TestCase):
     
     def test_similarity_detection(self):
         """Тест определения похожести названий"""
-        from difflib import SequenceMatcher
+        from rapidfuzz import fuzz
         
         # Очень похожие названия
         name1 = "выписка из егрюл"
         name2 = "выписка из егрюл"
-        similarity = SequenceMatcher(None, name1, name2).ratio()
+        similarity = fuzz.ratio(name1, name2)
         self.assertGreater(similarity, self.analyzer.SIMILARITY_THRESHOLD)
         
         # Разные названия
         name1 = "выписка из егрюл"
         name2 = "устав организации"
-        similarity = SequenceMatcher(None, name1, name2).ratio()
+        similarity = fuzz.ratio(name1, name2)
         self.assertLess(similarity, self.analyzer.SIMILARITY_THRESHOLD)
 
 
@@ -224,6 +383,77 @@ class TestEdgeCases(unittest.TestCase):
         self.assertEqual(len(unique), 3)
 
 
+class TestOpenAILikeClient(unittest.TestCase):
+    """
+    Тесты асинхронных вызовов клиента LLM
+    """
+
+    def test_batch_chat_preserves_order(self):
+        """Тест параллельных запросов: ответы в порядке входных сообщений"""
+        def handler(request):
+            payload = json.loads(request.content)
+            text = payload["messages"][0]["content"]
+            return httpx.Response(200, json={"choices": [{"message": {"content": text.upper()}}]})
+
+        client = OpenAILikeClient(base_url="http://llm.test/v1")
+        client._aclient = httpx.AsyncClient(
+            base_url=client.base_url, transport=httpx.MockTransport(handler)
+        )
+
+        async def run():
+            try:
+                return await client.batch_chat(
+                    [[{"role": "user", "content": text}] for text in ("a", "b", "c")],
+                    max_tokens=16,
+                )
+            finally:
+                await client.aclose()
+
+        self.assertEqual(asyncio.run(run()), ["A", "B", "C"])
+        self.assertIsNone(client._aclient)
+
+    def test_complete_many_groups_identical_prompts(self):
+        """Тест объединения одинаковых диалогов в один запрос с n"""
+        requests = []
+
+        def handler(request):
+            payload = json.loads(request.content)
+            requests.append(payload)
+            text = payload["messages"][0]["content"]
+            choices = [
+                {"index": i, "message": {"content": f"{text}{i}"}}
+                for i in range(payload.get("n", 1))
+            ]
+            return httpx.Response(200, json={"choices": choices[::-1]})
+
+        client = OpenAILikeClient(base_url="http://llm.test/v1")
+        client._client = httpx.Client(
+            base_url=client.base_url, transport=httpx.MockTransport(handler)
+        )
+
+        prompts = [[{"role": "user", "content": text}] for text in ("a", "b", "a", "a")]
+        results = client.complete_many(prompts)
+
+        self.assertEqual(results, ["a0", "b0", "a1", "a2"])
+        self.assertEqual(len(requests), 2)
+        self.assertEqual(requests[0]["n"], 3)
+        self.assertNotIn("n", requests[1])
+
+    def test_complete_many_rejects_ignored_n(self):
+        """Тест ошибки, если сервер игнорирует параметр n"""
+        def handler(request):
+            return httpx.Response(200, json={"choices": [{"index": 0, "message": {"content": "a"}}]})
+
+        client = OpenAILikeClient(base_url="http://llm.test/v1")
+        client._client = httpx.Client(
+            base_url=client.base_url, transport=httpx.MockTransport(handler)
+        )
+
+        prompt = [{"role": "user", "content": "a"}]
+        with self.assertRaises(ValueError):
+            client.complete_many([prompt, prompt])
+
+
 if __name__ == "__main__":
     # Запуск тестов
     unittest.main(verbosity=2)
@@ -15,7 +15,7 @@ import unittest
 import tempfile
 import shutil
 from pathlib import Path
-from datetime import datetime
+from datetime import datetime, timedelta
 
 from src.template_library import TemplateLibrary
 from src.forms_extractor import FormsExtractor
@@ -396,6 +396,67 @@ class TestControlWithChecklists(unittest.TestCase):
         history = self.controller.get_control_history()
         self.assertGreater(len(history), 0)
 
+    def test_checklist_reflects_updates(self):
+        """Тест актуальности чек-листа после изменения пунктов"""
+        before = self.controller.get_stage_checklist(1)
+        other_before = self.controller.get_stage_checklist(2)
+        self.assertFalse(before[0]["checked"])
+
+        item_id = self.controller.stages[1].checklist[0].id
+        self.controller.update_checklist_item(1, item_id, True, "user_1", "test_user")
+
+        after = self.controller.get_stage_checklist(1)
+        self.assertTrue(after[0]["checked"])
+        self.assertEqual(after[0]["checked_by"], "test_user")
+
+        # Кэш других этапов и других контроллеров не сбрасывается
+        self.assertIs(self.controller.get_stage_checklist(2), other_before)
+        MultiStageController()
+        self.assertIs(self.controller.get_stage_checklist(1), after)
+
+    def test_checklist_update_waits_for_running_control(self):
+        """Тест: ручное изменение чек-листа не вклинивается в идущий контроль"""
+        import threading
+        from unittest.mock import patch
+
+        stage = self.controller.stages[1]
+        started = threading.Event()
+        release = threading.Event()
+        original_check = type(stage)._check
+
+        def slow_check(self_stage, package):
+            started.set()
+            release.wait(5)
+            original_check(self_stage, package)
+
+        patcher = patch.object(type(stage), "_check", slow_check)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        control = threading.Thread(
+            target=self.controller.execute_full_control, args=({"documents": []},)
+        )
+        control.start()
+        self.assertTrue(started.wait(5))
+
+        item_id = stage.checklist[0].id
+        update = threading.Thread(
+            target=self.controller.update_checklist_item,
+            args=(1, item_id, True, "user_1", "Юрист")
+        )
+        update.start()
+        update.join(0.2)
+        # Пока контроль идет, изменение ждет блокировку
+        self.assertTrue(update.is_alive())
+
+        release.set()
+        control.join(5)
+        update.join(5)
+
+        actions = [entry["action"] for entry in self.controller.get_control_history()]
+        self.assertEqual(actions[-1], "checklist_update")
+        self.assertNotIn("checklist_update", actions[:-1])
+        self.assertTrue(self.controller.get_stage_checklist(1)[0]["checked"])
+
     def test_approve_stage(self):
         """Тест утверждения этапа"""
         # Сначала отмечаем все критические пункты
@@ -437,6 +498,49 @@ class TestControlWithChecklists(unittest.TestCase):
         self.assertEqual(stats["total_entries"], 1)
         self.assertEqual(stats["total_time_minutes"], 5)
 
+    def test_history_save_and_load(self):
+        """Тест сохранения и загрузки истории контроля"""
+        temp_dir = tempfile.mkdtemp()
+        try:
+            history = ControlHistory(temp_dir)
+            history.add_entry(
+                stage_name="Юридический",
+                action="approve",
+                user_id="user1",
+                user_name="Пользователь 1",
+                status_before="pending",
+                status_after="passed",
+                time_spent_minutes=3
+            )
+
+            loaded = ControlHistory.from_file(history.save("PKG-1"))
+
+            self.assertEqual(loaded.get_history(), history.get_history())
+        finally:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+
+    def test_to_dict_matches_dataclass_fields(self):
+        """Тест соответствия to_dict полям dataclass"""
+        from dataclasses import asdict
+        from src.control import ControlHistoryEntry
+
+        item = ChecklistItem(id="item", description="Пункт", category="test")
+        item.mark_checked("tester", "Комментарий")
+        entry = ControlHistoryEntry(
+            entry_id="CHE-1",
+            stage_name="Итоговый",
+            action="check",
+            user_id="user1",
+            user_name="Пользователь 1",
+            timestamp="2024-01-01T00:00:00",
+            status_before="pending",
+            status_after="passed",
+            attachments=["scan.pdf"]
+        )
+
+        for obj in (item, entry):
+            self.assertEqual(list(obj.to_dict().items()), list(asdict(obj).items()))
+
     def test_checklist_item_creation(self):
         """Тест создания элемента чек-листа"""
         item = ChecklistItem(
@@ -514,6 +618,61 @@ class TestCacheManagerSecurity(unittest.TestCase):
         result = cache.get("nonexistent_key")
         self.assertIsNone(result)
 
+    def test_cache_nested_dir_and_atomic_write(self):
+        """Тест создания вложенного каталога и записи без временных файлов"""
+        from src.utils.cache_manager import CacheManager
+
+        cache = CacheManager(str(Path(self.temp_dir) / "a" / "b"))
+        cache.set("key1", {"test": "data"})
+        cache.set("key2", {1, 2})  # Не сериализуется в JSON
+
+        self.assertEqual(cache.get("key1"), {"test": "data"})
+        self.assertIsNone(cache.get("key2"))
+        self.assertEqual([p.suffix for p in cache.cache_dir.iterdir()], [".cache"])
+
+
+class TestDocumentRegistry(unittest.TestCase):
+    """Тесты реестра документов"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_search_cache_invalidated_on_add(self):
+        """Тест сброса кэша поиска при добавлении документа"""
+        from src.document_registry import DocumentRegistry
+
+        registry = DocumentRegistry(self.temp_dir)
+        registry.add_document({"name": "Устав", "category": "legal"})
+
+        self.assertEqual(len(registry.search_documents(category="legal")), 1)
+        version = registry.version
+
+        registry.add_document({"name": "Выписка из ЕГРЮЛ", "category": "legal"})
+
+        self.assertGreater(registry.version, version)
+        self.assertEqual(len(registry.search_documents(category="legal")), 2)
+        self.assertEqual(len(registry.search_documents(query="устав")), 1)
+
+    def test_status_updated_with_expiry_date(self):
+        """Тест пересчета статуса при изменении срока действия"""
+        from src.document_registry import DocumentRegistry
+
+        registry = DocumentRegistry(self.temp_dir)
+        doc_id = registry.add_document({"name": "Лицензия", "category": "legal"})
+
+        self.assertEqual(len(registry.search_documents(status="valid")), 1)
+
+        expiry = (datetime.now() + timedelta(days=3)).isoformat()
+        registry.set_expiry_date(doc_id, expiry)
+
+        self.assertEqual(len(registry.search_documents(status="valid")), 0)
+        self.assertEqual(len(registry.search_documents(status="expiring_soon_7d")), 1)
+        with self.assertRaises(ValueError):
+            registry.set_expiry_date("doc_9999", expiry)
+
 
 if __name__ == "__main__":
     unittest.main(verbosity=2)